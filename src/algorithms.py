@@ -0,0 +1,43 @@
+# src/algorithms.py
+from heuristics import h_manhattan, h_euclidean, landmark_heuristic
+from search import (bfs_search, dfs_search, greedy_search, a_star_search,
+                    bidirectional_bfs_search, bidirectional_a_star_search,
+                    jps_search, wavefront_search, uniform_cost_search, dial_search)
+from bounded_search import ida_star_search, sma_star_search
+from hierarchical import hpa_star_search
+
+# Registro de algoritmos por nome, usado por run_experiments, benchmark e
+# path_service. Cada entrada é (nome, função que recebe o labirinto).
+
+# Conjunto padrão dos experimentos (run_experiments.py)
+ALGORITHMS = [
+    ("BFS", lambda m: bfs_search(m)),
+    ("DFS", lambda m: dfs_search(m)),
+    ("Greedy-Manhattan", lambda m: greedy_search(m, h_manhattan)),
+    ("A*-Manhattan", lambda m: a_star_search(m, h_manhattan)),
+    ("Greedy-Euclidean", lambda m: greedy_search(m, h_euclidean)),
+    ("A*-Euclidean", lambda m: a_star_search(m, h_euclidean)),
+    ("BiBFS", lambda m: bidirectional_bfs_search(m)),
+    ("BiA*-Manhattan", lambda m: bidirectional_a_star_search(m, h_manhattan)),
+    ("BiA*-Euclidean", lambda m: bidirectional_a_star_search(m, h_euclidean)),
+    ("Greedy-Landmarks", lambda m: greedy_search(m, landmark_heuristic(m))),
+    ("A*-Landmarks", lambda m: a_star_search(m, landmark_heuristic(m))),
+    ("A*-Manhattan-HighG", lambda m: a_star_search(m, h_manhattan, tie_break="high_g")),
+    # mesma busca com fronteira IndexedHeap: menos entradas no heap, mais tempo por operação
+    ("A*-Manhattan-HighG-DK", lambda m: a_star_search(m, h_manhattan, tie_break="high_g", decrease_key=True)),
+]
+
+# Todos os algoritmos (benchmark e serviço de caminhos)
+ALL_ALGORITHMS = ALGORITHMS + [
+    ("JPS-Manhattan", lambda m: jps_search(m, h_manhattan)),
+    ("JPS+-Manhattan", lambda m: jps_search(m, h_manhattan, use_table=True)),
+    ("Wavefront", lambda m: wavefront_search(m)),
+    ("UCS-Heap", lambda m: uniform_cost_search(m)),
+    ("UCS-Dial", lambda m: dial_search(m)),
+    ("A*-Dial-Manhattan", lambda m: dial_search(m, h_manhattan)),
+    ("IDA*-Manhattan-TT", lambda m: ida_star_search(m, h_manhattan, transposition_table=True)),
+    ("SMA*-Manhattan-10k", lambda m: sma_star_search(m, h_manhattan, max_nodes=10_000)),
+    ("HPA*-Manhattan", lambda m: hpa_star_search(m, h_manhattan)),
+]
+
+ALGORITHMS_BY_NAME = dict(ALL_ALGORITHMS)
@@ -0,0 +1,272 @@
+# src/benchmark.py
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from maze import Maze
+from generate_mazes import make_grid, terrain_costs
+from search import wavefront_search, dial_search
+from algorithms import ALL_ALGORITHMS
+
+QUICK_SIZES = [50, 100, 200, 400]
+FULL_SIZES = [50, 100, 200, 400, 800, 1600, 4000]
+DENSITIES = [0.1, 0.2, 0.3]
+
+
+def bench_maze(size: int, density: float, seed: int, max_cost: int = 1) -> Maze:
+    """
+    Labirinto aleatório size x size com caminho garantido, sempre o mesmo
+    para a mesma semente; max_cost > 1 acrescenta custos de terreno.
+    """
+    rng = np.random.default_rng([seed, size, int(round(density * 100))])
+    free, start, goal = make_grid(size, size, density, "random", rng, solvable="carve")
+    return Maze.from_array(free, start, goal, terrain_costs(size, size, max_cost, rng))
+
+def optimal_cost(mz: Maze) -> Optional[float]:
+    """Custo ótimo do labirinto (onda vetorizada; Dial quando há custos de terreno)."""
+    res = wavefront_search(mz) if mz.costs is None else dial_search(mz)
+    return res.cost if res.found else None
+
+def time_runs(fn, mz, repeats: int):
+    """Tempos de `repeats` execuções (com o gc desligado em cada uma) e o último resultado."""
+    times, res = [], None
+    for _ in range(repeats):
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            res = fn(mz)
+            times.append(time.perf_counter() - t0)
+        finally:
+            gc.enable()
+    return times, res
+
+def select_algorithms(names: Optional[List[str]] = None) -> List[Tuple[str, Callable]]:
+    """Entradas de ALL_ALGORITHMS com esses nomes (todas se None); nome desconhecido é ValueError."""
+    if names is None:
+        return list(ALL_ALGORITHMS)
+    known = dict(ALL_ALGORITHMS)
+    unknown = [n for n in names if n not in known]
+    if unknown:
+        raise ValueError(f"Algoritmos desconhecidos: {', '.join(unknown)} (disponíveis: {', '.join(known)})")
+    if not names:
+        raise ValueError("Nenhum algoritmo selecionado")
+    return [(n, fn) for n, fn in ALL_ALGORITHMS if n in names]
+
+def run_benchmark(sizes: Sequence[int], densities: Sequence[float], algorithms: Optional[List[str]] = None,
+                  repeats: int = 7, seed: int = 1234, max_time: float = 30.0, max_cost: int = 1) -> Dict:
+    """
+    Mede cada algoritmo em cada (tamanho, densidade): melhor tempo e mediana
+    de `repeats` execuções, nós expandidos e tamanho máximo da fronteira. Um algoritmo que passar de
+    max_time segundos num tamanho não roda nos tamanhos maiores daquela
+    densidade.
+    """
+    selected = select_algorithms(algorithms)
+    results = []
+    for density in densities:
+        too_slow = set()
+        for size in sorted(sizes):
+            mz = bench_maze(size, density, seed, max_cost)
+            optimum = optimal_cost(mz)
+            for name, fn in selected:
+                if name in too_slow:
+                    continue
+                fn(mz)  # aquecimento (e pré-processamentos em cache, como landmarks)
+                times, res = time_runs(fn, mz, repeats)
+                best = min(times)
+                results.append({
+                    "algorithm": name, "size": size, "density": density, "cells": size * size,
+                    "time_s": best, "time_median_s": float(np.median(times)),
+                    "nodes_expanded": res.metrics.get("nodes_expanded", 0),
+                    "max_frontier_size": res.metrics.get("max_frontier_size", 0),
+                    "cost": res.cost if res.found else None, "optimal_cost": optimum,
+                })
+                print(f"  {size}x{size} d={density:.2f} {name}: {best:.4f}s, "
+                      f"{results[-1]['nodes_expanded']} nós expandidos, "
+                      f"fronteira máx. {results[-1]['max_frontier_size']}")
+                if best > max_time:
+                    too_slow.add(name)
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "seed": seed,
+            "repeats": repeats,
+            "max_cost": max_cost,
+            "sizes": sorted(sizes),
+            "densities": list(densities),
+            "algorithms": [n for n, _ in selected],
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+        "exponents": scaling_exponents(results),
+    }
+
+def scaling_exponents(results: List[dict]) -> List[dict]:
+    """Ajusta tempo ~ células^k e nós ~ células^k (mínimos quadrados em log-log)."""
+    groups: Dict[tuple, List[dict]] = {}
+    for r in results:
+        groups.setdefault((r["algorithm"], r["density"]), []).append(r)
+    out = []
+    for (algorithm, density), rows in sorted(groups.items()):
+        if len(rows) < 2:
+            continue
+        cells = np.log([r["cells"] for r in rows])
+        row = {"algorithm": algorithm, "density": density}
+        for key in ("time_s", "nodes_expanded"):
+            values = np.array([r[key] for r in rows], dtype=float)
+            if (values > 0).all():
+                row[f"{key}_exponent"] = float(np.polyfit(cells, np.log(values), 1)[0])
+        out.append(row)
+    return out
+
+def path_quality(results: List[dict]) -> List[dict]:
+    """Razão custo encontrado / custo ótimo de cada algoritmo (média e pior caso)."""
+    ratios: Dict[str, List[float]] = {}
+    for r in results:
+        if r["cost"] is not None and r.get("optimal_cost"):
+            ratios.setdefault(r["algorithm"], []).append(r["cost"] / r["optimal_cost"])
+    return [{"algorithm": a, "mean_ratio": float(np.mean(v)), "max_ratio": float(max(v))}
+            for a, v in ratios.items()]
+
+def _label(r: dict) -> str:
+    return f"{r['algorithm']} {r['size']}x{r['size']} d={r['density']:.2f}"
+
+def compare_to_baseline(current: Dict, baseline: Dict, time_tolerance: float, nodes_tolerance: float,
+                        time_floor: float = 0.005) -> Tuple[List[str], List[str]]:
+    """
+    Compara com a baseline e devolve (regressões, entradas não comparadas).
+
+    Tempo: por algoritmo, média geométrica das razões entre as medianas
+    (atual / baseline); falha se passar de 1 + time_tolerance. Tempos abaixo
+    de time_floor segundos contam como time_floor, então oscilações de
+    poucos milissegundos não pesam. Nós expandidos (determinísticos) são
+    comparados entrada a entrada.
+
+    Uma entrada da baseline que não foi medida agora, com o algoritmo, o
+    tamanho e a densidade dela presentes nesta execução (por exemplo, pulada
+    por passar de max_time num tamanho menor), é regressão; as que ficaram
+    fora da seleção (--algorithms, --sizes, --densities) só são listadas.
+    """
+    def median(r):
+        return r.get("time_median_s", r["time_s"])  # baselines antigas só têm o melhor tempo
+
+    base = {(r["algorithm"], r["size"], r["density"]): r for r in baseline["results"]}
+    measured = {(r["algorithm"], r["size"], r["density"]) for r in current["results"]}
+    failures, ratios = [], {}
+    for r in current["results"]:
+        b = base.get((r["algorithm"], r["size"], r["density"]))
+        if b is None:
+            continue
+        ratio = max(median(r), time_floor) / max(median(b), time_floor)
+        ratios.setdefault(r["algorithm"], []).append((ratio, r, b))
+        if r["nodes_expanded"] > b["nodes_expanded"] * (1 + nodes_tolerance):
+            failures.append(f"{_label(r)}: nós expandidos {r['nodes_expanded']} > {b['nodes_expanded']}")
+
+    for algorithm, entries in sorted(ratios.items()):
+        geomean = float(np.exp(np.mean(np.log([e[0] for e in entries]))))
+        if geomean > 1 + time_tolerance:
+            worst, r, b = max(entries, key=lambda e: e[0])
+            failures.append(f"{algorithm}: tempo mediano {100 * (geomean - 1):+.0f}% (média geométrica de "
+                            f"{len(entries)} entradas; pior {_label(r)}: {median(r):.4f}s > {median(b):.4f}s)")
+
+    meta = current.get("meta", {})
+    algorithms = set(meta.get("algorithms", [k[0] for k in measured]))
+    sizes = set(meta.get("sizes", [k[1] for k in measured]))
+    densities = set(meta.get("densities", [k[2] for k in measured]))
+    skipped = []
+    for key, b in base.items():
+        if key in measured:
+            continue
+        if key[0] in algorithms and key[1] in sizes and key[2] in densities:
+            failures.append(f"{_label(b)}: não medido nesta execução (baseline {median(b):.4f}s)")
+        else:
+            skipped.append(_label(b))
+    return failures, skipped
+
+def report(current: Dict, failures: Optional[List[str]] = None, skipped: Optional[List[str]] = None) -> str:
+    lines = ["# Benchmark de escalabilidade", "",
+             f"Python {current['meta']['python']} ({current['meta']['machine']}), "
+             f"melhor de {current['meta']['repeats']} execuções, semente {current['meta']['seed']}.", "",
+             "| Algoritmo | Densidade | Expoente tempo | Expoente nós |", "|---|---|---|---|"]
+    for e in current["exponents"]:
+        lines.append(f"| {e['algorithm']} | {e['density']:.2f} | "
+                     f"{e.get('time_s_exponent', float('nan')):.2f} | "
+                     f"{e.get('nodes_expanded_exponent', float('nan')):.2f} |")
+    largest = max(r["size"] for r in current["results"])
+    lines += ["", f"Tempos no maior tamanho medido ({largest}x{largest}):", ""]
+    for r in current["results"]:
+        if r["size"] == largest:
+            lines.append(f"- {r['algorithm']} d={r['density']:.2f}: {r['time_s']:.4f}s, "
+                         f"{r['nodes_expanded']} nós expandidos, "
+                         f"fronteira máx. {r.get('max_frontier_size', 0)}")
+    suboptimal = [q for q in path_quality(current["results"]) if q["max_ratio"] > 1 + 1e-9]
+    lines += ["", "Custo do caminho em relação ao ótimo (média / pior caso):", ""]
+    lines += [f"- {q['algorithm']}: {q['mean_ratio']:.3f} / {q['max_ratio']:.3f}" for q in suboptimal]
+    lines.append("\nOs demais algoritmos encontraram sempre o custo ótimo." if suboptimal
+                 else "Todos os algoritmos encontraram o custo ótimo.")
+    if failures is not None:
+        lines += ["", "## Regressões", ""]
+        lines += [f"- {f}" for f in failures] if failures else ["Nenhuma regressão acima da tolerância."]
+    if skipped:
+        lines += ["", f"{len(skipped)} entradas da baseline ficaram fora desta execução e não foram comparadas."]
+    return "\n".join(lines) + "\n"
+
+
+if __name__ == "__main__":
+    HERE = Path(__file__).parent
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidade com verificação de regressões")
+    parser.add_argument("--full", action="store_true", help=f"tamanhos {FULL_SIZES} (padrão: {QUICK_SIZES})")
+    parser.add_argument("--sizes", nargs="*", type=int, default=None)
+    parser.add_argument("--densities", nargs="*", type=float, default=DENSITIES)
+    parser.add_argument("--algorithms", nargs="*", default=None)
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--max-cost", type=int, default=1, help="custo máximo de terreno (1 = grid unitário)")
+    parser.add_argument("--max-time", type=float, default=30.0, help="segundos por execução antes de parar de crescer")
+    parser.add_argument("--output-dir", default=os.path.join(HERE.parent, "results", "benchmark"))
+    parser.add_argument("--save-baseline", default=None, help="grava o resultado como baseline JSON")
+    parser.add_argument("--baseline", default=None, help="baseline JSON para comparar")
+    parser.add_argument("--time-tolerance", type=float, default=0.25)
+    parser.add_argument("--nodes-tolerance", type=float, default=0.0)
+    parser.add_argument("--time-floor", type=float, default=0.005,
+                        help="segundos abaixo dos quais diferenças de tempo são ruído")
+    args = parser.parse_args()
+    try:
+        select_algorithms(args.algorithms)
+    except ValueError as e:
+        parser.error(str(e))
+
+    sizes = args.sizes or (FULL_SIZES if args.full else QUICK_SIZES)
+    current = run_benchmark(sizes, args.densities, args.algorithms, args.repeats, args.seed, args.max_time,
+                            args.max_cost)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(os.path.join(args.output_dir, "benchmark_latest.json"), "w", encoding="utf-8") as f:
+        json.dump(current, f, indent=2)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Baseline salva em {args.save_baseline}")
+
+    failures = skipped = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            failures, skipped = compare_to_baseline(current, json.load(f), args.time_tolerance,
+                                                    args.nodes_tolerance, args.time_floor)
+
+    text = report(current, failures, skipped)
+    with open(os.path.join(args.output_dir, "benchmark_report.md"), "w", encoding="utf-8") as f:
+        f.write(text)
+    print("\n" + text)
+    sys.exit(1 if failures else 0)
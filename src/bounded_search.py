@@ -0,0 +1,357 @@
+# src/bounded_search.py
+import heapq
+import time
+from typing import Callable, List, Optional, Tuple
+
+from heuristics import h_manhattan
+from search import SearchResult, _common_metrics_init, _known_unreachable, _unreachable
+
+Pos = Tuple[int, int]
+INF = float('inf')
+
+# ----------------------------------------------------------------------
+# Buscas ótimas com memória limitada. Nenhuma das duas guarda arrays do
+# tamanho do grid (fora um bit por célula usado só para contar quantas
+# expansões foram repetidas): a memória é o parâmetro que se escolhe, e o
+# preço aparece em metrics['re_expansions'].
+# ----------------------------------------------------------------------
+
+
+def ida_star_search(maze, heuristic: Callable[[Pos, Pos], float] = h_manhattan,
+                    transposition_table: bool = False, table_size: Optional[int] = None,
+                    max_expansions: Optional[int] = None) -> SearchResult:
+    """
+    IDA*: buscas em profundidade com limite de f crescente. A memória é a do
+    caminho atual (pilha e células no caminho, para evitar ciclos).
+
+    Com transposition_table=True, cada iteração guarda num dicionário o menor
+    g com que cada célula foi alcançada e corta caminhos que chegam a ela com
+    g maior ou igual, o que elimina a maior parte das expansões repetidas.
+    table_size limita o número de entradas (None = sem limite); com a tabela
+    cheia, células novas deixam de ser guardadas.
+
+    max_expansions interrompe a busca (metrics['aborted'] = True).
+    """
+    start_time = time.perf_counter()
+    metrics = _common_metrics_init()
+
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    moves, mask, W, goal_pos = maze.moves, maze.nbr_mask, maze.W, maze.goal
+    seen = bytearray((maze.N + 7) // 8)
+    distinct = 0
+    generated = expanded = iterations = 0
+    max_depth = max_table = 0
+    bound = heuristic(maze.start, goal_pos)
+    found = aborted = False
+    stack = []
+
+    while not found and bound < INF:
+        iterations += 1
+        table = {s: 0.0} if transposition_table else None
+        next_bound = INF
+        # entradas [célula, g, filhos ainda não visitados (None = não expandida)]
+        stack = [[s, 0.0, None]]
+        on_path = {s}
+
+        while stack:
+            top = stack[-1]
+            u, g, children = top
+            if children is None:
+                f = g + heuristic(divmod(u, W), goal_pos)
+                if f > bound:
+                    if f < next_bound:
+                        next_bound = f
+                    stack.pop()
+                    on_path.discard(u)
+                    continue
+                expanded += 1
+                if not seen[u >> 3] & (1 << (u & 7)):
+                    seen[u >> 3] |= 1 << (u & 7)
+                    distinct += 1
+                if u == goal:
+                    found = True
+                    break
+                if max_expansions is not None and expanded >= max_expansions:
+                    aborted = True
+                    break
+                # invertido para que pop() siga a ordem N, S, O, L
+                children = top[2] = [u + d for d in reversed(moves[mask[u]])]
+                generated += len(children)
+                if len(stack) > max_depth:
+                    max_depth = len(stack)
+
+            if not children:
+                stack.pop()
+                on_path.discard(u)
+                continue
+            q = children.pop()
+            if q in on_path:
+                continue
+            gq = g + 1.0
+            if table is not None:
+                prev = table.get(q)
+                if prev is not None and prev <= gq:
+                    continue
+                if prev is not None or table_size is None or len(table) < table_size:
+                    table[q] = gq
+            stack.append([q, gq, None])
+            on_path.add(q)
+
+        if table is not None and len(table) > max_table:
+            max_table = len(table)
+        if aborted:
+            break
+        bound = next_bound
+
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_depth, max_explored_size=max_table,
+                   iterations=iterations, distinct_expanded=distinct,
+                   re_expansions=expanded - distinct, aborted=aborted)
+    elapsed = time.perf_counter() - start_time
+    if not found:
+        return SearchResult(False, [], INF, elapsed, metrics)
+    return SearchResult(True, [divmod(e[0], W) for e in stack], stack[-1][1], elapsed, metrics)
+
+
+class _SMANode:
+    __slots__ = ('cell', 'g', 'f', 'depth', 'parent', 'slot', 'succs', 'children',
+                 'dead', 'born', 'forgot', 'n_children', 'in_open', 'stamp')
+
+    def __init__(self, cell, g, f, depth, parent, slot):
+        self.cell, self.g, self.f, self.depth = cell, g, f, depth
+        self.parent, self.slot = parent, slot
+        self.succs = None       # células sucessoras (sem voltar para o pai)
+        self.children = None    # filho em memória em cada posição de succs
+        self.dead = 0           # bits: sucessores que não levam ao objetivo
+        self.born = 0           # bits: sucessores já gerados alguma vez
+        self.forgot = None      # posição -> f de um filho esquecido
+        self.n_children = 0
+        self.in_open = False
+        self.stamp = 0
+
+    def next_pending(self) -> int:
+        # primeiro os sucessores nunca gerados; depois o esquecido de menor f
+        best, best_f = -1, INF
+        for k, child in enumerate(self.children):
+            if child is None and not self.dead >> k & 1:
+                if not self.born >> k & 1:
+                    return k
+                f = self.forgot.get(k, INF) if self.forgot else INF
+                if best == -1 or f < best_f:
+                    best, best_f = k, f
+        return best
+
+
+def sma_star_search(maze, heuristic: Callable[[Pos, Pos], float] = h_manhattan,
+                    max_nodes: int = 100_000) -> SearchResult:
+    """
+    SMA* (A* simplificado com memória limitada): busca em árvore que guarda
+    no máximo max_nodes nós. Cada passo gera um sucessor do nó aberto de menor
+    f (o mais profundo, nos empates); com a memória cheia esquece a folha de
+    maior f (a mais rasa, nos empates), e o pai guarda o f do filho esquecido
+    para só regenerá-lo quando ele voltar a ser o melhor caminho.
+
+    Cada célula tem no máximo um nó em memória: um caminho que chega a uma
+    célula já na árvore com g maior ou igual é descartado, e um com g menor
+    substitui a subárvore antiga.
+
+    É ótima se o caminho ótimo couber na memória (comprimento < max_nodes);
+    caso contrário não encontra solução (metrics['memory_exhausted']).
+    metrics['re_expansions'] conta os nós regenerados depois de esquecidos.
+    """
+    if max_nodes < 2:
+        raise ValueError("max_nodes deve ser pelo menos 2")
+    start_time = time.perf_counter()
+    metrics = _common_metrics_init()
+
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    moves, mask, W, goal_pos = maze.moves, maze.nbr_mask, maze.W, maze.goal
+    heappush, heappop = heapq.heappush, heapq.heappop
+    # dois heaps com remoção preguiçosa (entradas com stamp antigo são
+    # ignoradas): lo escolhe o melhor nó aberto, hi a folha a esquecer
+    lo, hi = [], []
+    in_memory = {}  # célula -> nó
+    counter = n_open = 0
+    generated = expanded = regenerated = forgotten = dead_ends = duplicates = 0
+    max_open = 0
+
+    def open_node(n):
+        nonlocal counter, n_open
+        if not n.in_open:
+            n.in_open = True
+            n_open += 1
+        n.stamp += 1
+        counter += 1
+        heappush(lo, (n.f, -n.depth, counter, n.stamp, n))
+        heappush(hi, (-n.f, n.depth, counter, n.stamp, n))
+
+    def close_node(n):
+        nonlocal n_open
+        if n.in_open:
+            n.in_open = False
+            n_open -= 1
+
+    def detach(n):
+        nonlocal used
+        close_node(n)
+        del in_memory[n.cell]
+        p = n.parent
+        p.children[n.slot] = None
+        p.n_children -= 1
+        used -= 1
+        if p.n_children == 0 and p.in_open:
+            open_node(p)  # virou folha: entradas antigas em hi podem ter sido descartadas
+        return p
+
+    def drop_subtree(n):
+        # remove n e os descendentes; o pai passa a ver a posição como morta
+        nonlocal used
+        stack = [c for c in n.children if c is not None] if n.children else []
+        while stack:
+            c = stack.pop()
+            close_node(c)
+            del in_memory[c.cell]
+            used -= 1
+            if c.children:
+                stack.extend(x for x in c.children if x is not None)
+        p = detach(n)
+        p.dead |= 1 << n.slot
+        if p.forgot:
+            p.forgot.pop(n.slot, None)
+        return p
+
+    def settle(n):
+        # Atualiza n depois que um sucessor dele mudou: fecha-o se não há
+        # mais o que gerar, remove-o se todos os sucessores morreram e, com
+        # todos os sucessores já gerados, propaga para cima o menor f deles.
+        while n is not None:
+            k = n.next_pending()
+            if k == -1 and n.n_children == 0:
+                if n.parent is None:
+                    n.f = INF
+                    return
+                p = detach(n)
+                p.dead |= 1 << n.slot
+                if p.forgot:
+                    p.forgot.pop(n.slot, None)
+                n = p
+                continue
+            if k == -1:
+                close_node(n)
+            elif not n.in_open:
+                open_node(n)
+            if (n.born | n.dead) != (1 << len(n.succs)) - 1:
+                return
+            fs = [c.f for c in n.children if c is not None]
+            if n.forgot:
+                fs.extend(n.forgot.values())
+            new_f = min(fs, default=INF)
+            if new_f <= n.f:
+                return
+            n.f = new_f
+            if n.in_open:
+                open_node(n)
+            n = n.parent
+
+    root = _SMANode(s, 0.0, heuristic(maze.start, goal_pos), 0, None, -1)
+    in_memory[s] = root
+    open_node(root)
+    used = max_used = 1
+    result_node = None
+
+    while n_open and root.f < INF:
+        entry = lo[0]
+        best = entry[4]
+        if not best.in_open or entry[3] != best.stamp:
+            heappop(lo)
+            continue
+        if best.f == INF:
+            break
+        expanded += 1
+        if best.cell == goal:
+            result_node = best
+            break
+
+        if best.succs is None:
+            back = best.parent.cell if best.parent is not None else -1
+            u = best.cell
+            best.succs = tuple(u + d for d in moves[mask[u]] if u + d != back)
+            best.children = [None] * len(best.succs)
+        k = best.next_pending()
+        if k == -1:
+            settle(best)
+            continue
+
+        q = best.succs[k]
+        generated += 1
+        depth = best.depth + 1
+        g = best.g + 1.0
+        other = in_memory.get(q)
+        if other is not None and other.g > g:
+            # antes de mexer na posição k: a subárvore removida pode ser
+            # descendente de best, e settle recalcula o f dele
+            settle(drop_subtree(other))
+        remembered = best.forgot.pop(k, 0.0) if best.forgot else 0.0
+        if best.born >> k & 1:
+            regenerated += 1
+        best.born |= 1 << k
+        if other is not None and other.g <= g:
+            best.dead |= 1 << k
+            duplicates += 1
+        elif q != goal and depth >= max_nodes - 1:
+            # um caminho que passe daqui não cabe na memória
+            best.dead |= 1 << k
+            dead_ends += 1
+        else:
+            f = max(best.f, remembered, g + heuristic(divmod(q, W), goal_pos))
+            child = _SMANode(q, g, f, depth, best, k)
+            best.children[k] = child
+            best.n_children += 1
+            in_memory[q] = child
+            used += 1
+            open_node(child)
+        settle(best)
+
+        while used > max_nodes:
+            entry = heappop(hi)
+            leaf = entry[4]
+            if not leaf.in_open or entry[3] != leaf.stamp or leaf.n_children or leaf is root:
+                continue
+            parent = detach(leaf)
+            if parent.forgot is None:
+                parent.forgot = {}
+            parent.forgot[leaf.slot] = leaf.f
+            forgotten += 1
+            settle(parent)
+
+        if used > max_used:
+            max_used = used
+        if n_open > max_open:
+            max_open = n_open
+
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_open, max_explored_size=max_used,
+                   re_expansions=regenerated, forgotten_nodes=forgotten,
+                   duplicates_pruned=duplicates,
+                   memory_exhausted=result_node is None and dead_ends > 0)
+    elapsed = time.perf_counter() - start_time
+    if result_node is None:
+        return SearchResult(False, [], INF, elapsed, metrics)
+
+    rev: List[Pos] = []
+    n = result_node
+    while n is not None:
+        rev.append(divmod(n.cell, W))
+        n = n.parent
+    rev.reverse()
+    return SearchResult(True, rev, result_node.g, elapsed, metrics)
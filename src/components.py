@@ -0,0 +1,187 @@
+# src/components.py
+from array import array
+from typing import Iterable, Tuple
+
+import numpy as np
+
+Pos = Tuple[int, int]
+
+# Anel das 8 células em volta de uma célula, em sentido horário a partir do
+# norte: os índices pares são os 4 vizinhos, os ímpares os cantos entre eles.
+_RING = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))
+
+
+def label_components(free: np.ndarray) -> Tuple[np.ndarray, int]:
+    """
+    Rotula as componentes 4-conexas das células livres de um array H x W
+    booleano. Retorna (rótulos H x W em int32, com -1 nas paredes, número de
+    componentes); os rótulos vão de 0 a n - 1.
+
+    Tudo vetorizado: cada trecho horizontal livre vira um nó, as ligações
+    verticais entre trechos viram arestas, e um union-find em numpy
+    (ligação do maior rótulo ao menor seguida de saltos de ponteiro) junta os
+    trechos até nenhuma aresta ligar raízes diferentes.
+    """
+    free = np.asarray(free, dtype=bool)
+    H, W = free.shape
+    if not free.any():
+        return np.full((H, W), -1, dtype=np.int32), 0
+    starts = free.copy()
+    starts[:, 1:] &= ~free[:, :-1]
+    run = np.cumsum(starts.ravel()).reshape(H, W) - 1  # trecho de cada célula livre
+    n_runs = int(run[-1, -1]) + 1
+
+    both = free[:-1, :] & free[1:, :]
+    a, b = run[:-1, :][both], run[1:, :][both]
+    parent = np.arange(n_runs)
+    while a.size:
+        ra, rb = parent[a], parent[b]
+        split = ra != rb
+        if not split.any():
+            break
+        a, b, ra, rb = a[split], b[split], ra[split], rb[split]
+        np.minimum.at(parent, np.maximum(ra, rb), np.minimum(ra, rb))
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+    # numera as raízes de 0 a n - 1 na ordem dos trechos
+    is_root = parent == np.arange(n_runs)
+    comp = (np.cumsum(is_root) - 1)[parent].astype(np.int32)
+    labels = np.where(free, comp[run], np.int32(-1))
+    return labels, int(np.count_nonzero(is_root))
+
+
+class ComponentIndex:
+    """
+    Índice de alcançabilidade de um labirinto: componente conexa de cada
+    célula livre, para responder "b é alcançável a partir de a?" em O(1),
+    sem busca. Montado uma vez por labirinto (label_components) e guardado
+    em maze.derived.
+
+    Mudanças de células chegam por cells_changed (ver Maze.set_cells). Abrir
+    uma célula une as componentes dos vizinhos (union-find sobre os rótulos).
+    Fechar uma célula só pode separar a componente quando os vizinhos livres
+    dela não se ligam pelo anel de 8 células em volta; nesse caso o índice é
+    remontado na próxima consulta.
+    """
+
+    def __init__(self, maze):
+        self.stats = {'builds': 0, 'cells_opened': 0, 'cells_closed': 0}
+        self._build(maze)
+
+    def _build(self, maze):
+        free = np.frombuffer(maze.cells, dtype=np.uint8).reshape(maze.H, maze.W).astype(bool)
+        labels, n = label_components(free)
+        self.labels = array('i')
+        self.labels.frombytes(labels.tobytes())
+        self.parent = array('i', range(n))
+        self._stale = None  # labirinto a reler quando o índice fica desatualizado
+        self.stats['builds'] += 1
+
+    def _refresh(self):
+        if self._stale is not None:
+            self._build(self._stale)
+
+    def _root(self, label: int) -> int:
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def component(self, cell: int) -> int:
+        """Rótulo da componente da célula (id), ou -1 se for parede."""
+        self._refresh()
+        label = self.labels[cell]
+        return self._root(label) if label >= 0 else -1
+
+    def connected(self, a: int, b: int) -> bool:
+        """As células (ids) a e b são livres e estão na mesma componente?"""
+        self._refresh()
+        la, lb = self.labels[a], self.labels[b]
+        if la < 0 or lb < 0:
+            return False
+        return la == lb or self._root(la) == self._root(lb)
+
+    def connected_many(self, a: Iterable[int], b: Iterable[int]) -> np.ndarray:
+        """Versão em lote de connected: array booleano com um valor por par (a[i], b[i])."""
+        self._refresh()
+        roots = np.frombuffer(self.parent, dtype=np.int32).copy()
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                break
+            roots = jumped
+        labels = np.frombuffer(self.labels, dtype=np.int32)
+        la = labels[np.asarray(a, dtype=np.int64)]
+        lb = labels[np.asarray(b, dtype=np.int64)]
+        if roots.size == 0:
+            return np.zeros(la.shape, dtype=bool)
+        ca = np.where(la >= 0, roots[la], -1)
+        cb = np.where(lb >= 0, roots[lb], -1)
+        return (ca == cb) & (ca >= 0)
+
+    # ------------------------------------------------------------------
+    # Atualização incremental
+    # ------------------------------------------------------------------
+    def cells_changed(self, maze, ids) -> bool:
+        if self._stale is not None:
+            return True  # já vai ser remontado
+        labels, parent, cells = self.labels, self.parent, maze.cells
+        moves, mask = maze.moves, maze.nbr_mask
+        batch = set(ids) if len(ids) > 1 else None
+        for x in ids:
+            if cells[x]:
+                self.stats['cells_opened'] += 1
+                roots = {self._root(labels[x + d]) for d in moves[mask[x]] if labels[x + d] >= 0}
+                if not roots:
+                    labels[x] = len(parent)
+                    parent.append(len(parent))
+                    continue
+                keep = min(roots)
+                for r in roots:
+                    parent[r] = keep
+                labels[x] = keep
+            else:
+                self.stats['cells_closed'] += 1
+                labels[x] = -1
+                if not self._ring_connected(maze, x, batch):
+                    self._stale = maze
+                    return True
+        return True
+
+    @staticmethod
+    def _ring_connected(maze, x: int, batch) -> bool:
+        # Os vizinhos livres de x continuam ligados sem x se, andando pelo
+        # anel de 8 células em volta, k vizinhos livres formam no máximo um
+        # grupo: dois vizinhos consecutivos se ligam pelo canto entre eles, e
+        # k - 1 ligações bastam (as k formam um ciclo). Se outra célula do
+        # mesmo lote está no anel, o teste não vale e a resposta é "não".
+        H, W, cells = maze.H, maze.W, maze.cells
+        r, c = divmod(x, W)
+        ring = []
+        for dr, dc in _RING:
+            if not (0 <= r + dr < H and 0 <= c + dc < W):
+                ring.append(False)
+                continue
+            y = (r + dr) * W + c + dc
+            if batch is not None and y in batch:
+                return False
+            ring.append(cells[y] == 1)
+        n_free = ring[0] + ring[2] + ring[4] + ring[6]
+        links = sum(1 for k in (0, 2, 4, 6) if ring[k] and ring[k + 1] and ring[(k + 2) % 8])
+        return n_free - links <= 1
+
+
+def component_index(maze) -> ComponentIndex:
+    """Índice de componentes do labirinto, montado uma vez e guardado em maze.derived."""
+    index = maze.derived.get('components')
+    if index is None:
+        index = maze.derived['components'] = ComponentIndex(maze)
+    return index
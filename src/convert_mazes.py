@@ -0,0 +1,29 @@
+# src/convert_mazes.py
+import argparse
+from pathlib import Path
+from maze import Maze, BIN_SUFFIX
+
+def convert(path: str, to: str, output_dir: str = None) -> Path:
+    """Converte um labirinto entre o formato texto (.txt) e o binário (.mazb)."""
+    src = Path(path)
+    suffix = BIN_SUFFIX if to == "bin" else ".txt"
+    dst = Path(output_dir or src.parent) / (src.stem + suffix)
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if dst.resolve() == src.resolve():
+        raise ValueError(f"Origem e destino são o mesmo arquivo: {src}")
+    mz = Maze.from_file(str(src))
+    if to == "bin":
+        mz.to_binary(str(dst))
+    else:
+        mz.to_text(str(dst))
+    return dst
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Converte labirintos entre .txt e o formato binário .mazb")
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--to", choices=["bin", "txt"], default="bin")
+    parser.add_argument("--output-dir", default=None)
+    args = parser.parse_args()
+
+    for f in args.files:
+        print(f"{f} -> {convert(f, args.to, args.output_dir)}")
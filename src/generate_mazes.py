@@ -1,39 +1,205 @@
-# src/generate_mazes.py
-import random
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
 
-def generate_maze(width, height, densidade=0.25, nome_arquivo="labirinto.txt"):
-    
-    grid = [['.' for _ in range(width)] for _ in range(height)]
-
-    # Posição inicial e final fixas nos cantos
-    grid[0][0] = 'S'
-    grid[height-1][width-1] = 'G'
-
-    # Preenche com paredes aleatórias
-    for r in range(height):
-        for c in range(width):
-            if (r, c) not in [(0, 0), (height-1, width-1)]:
-                if random.random() < densidade:
-                    grid[r][c] = '#'
-
-    # Garante que início e fim estão livres
-    grid[0][0] = 'S'
-    grid[height-1][width-1] = 'G'
-
-    os.makedirs("../data", exist_ok=True)
-    caminho = os.path.join("../data", nome_arquivo)
-    with open(caminho, 'w', encoding='utf-8') as f:
-        for linha in grid:
-            f.write(''.join(linha) + '\n')
+import numpy as np
+
+from maze import Maze, write_text, write_binary, BIN_SUFFIX
+from search import _wavefront
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+TOPOLOGIES = ("random", "perfect", "rooms", "open")
+
+
+# ----------------------------------------------------------------------
+# Topologias: cada função devolve um array H x W booleano (verdadeiro = livre)
+# e as posições de início e objetivo
+# ----------------------------------------------------------------------
+def _random_walls(height, width, densidade, rng):
+    free = rng.random((height, width)) >= densidade
+    return free, (0, 0), (height - 1, width - 1)
+
+def _perfect_maze(height, width, densidade, rng):
+    # Árvore binária: células nas coordenadas pares; cada uma abre a passagem
+    # para o norte ou para o leste. Gera um labirinto perfeito (uma única rota
+    # entre quaisquer duas células) sem laço por célula.
+    hc, wc = (height + 1) // 2, (width + 1) // 2
+    free = np.zeros((height, width), dtype=bool)
+    free[0::2, 0::2] = True
+    north = rng.random((hc, wc)) < 0.5
+    north[0, :] = False
+    north[:, -1] = True
+    north[0, -1] = False
+    ii, jj = np.nonzero(north)
+    free[2 * ii - 1, 2 * jj] = True
+    ii, jj = np.nonzero(~north)
+    keep = jj < wc - 1
+    free[2 * ii[keep], 2 * jj[keep] + 1] = True
+    return free, (0, 0), (2 * (hc - 1), 2 * (wc - 1))
+
+def _rooms(height, width, densidade, rng, room=8):
+    # Salas room x room separadas por paredes, com uma porta em cada parede
+    # entre salas vizinhas; densidade controla obstáculos dentro das salas.
+    free = rng.random((height, width)) >= densidade
+    wall_rows = np.arange(room - 1, height - 1, room)
+    wall_cols = np.arange(room - 1, width - 1, room)
+    free[wall_rows, :] = False
+    free[:, wall_cols] = False
+    starts_c = np.concatenate(([0], wall_cols + 1))
+    ends_c = np.concatenate((wall_cols, [width]))
+    starts_r = np.concatenate(([0], wall_rows + 1))
+    ends_r = np.concatenate((wall_rows, [height]))
+    for r in wall_rows:
+        doors = starts_c + (rng.random(starts_c.size) * (ends_c - starts_c)).astype(int)
+        free[r, doors] = True
+        free[r - 1, doors] = free[r + 1, doors] = True
+    for c in wall_cols:
+        doors = starts_r + (rng.random(starts_r.size) * (ends_r - starts_r)).astype(int)
+        free[doors, c] = True
+        free[doors, c - 1] = free[doors, c + 1] = True
+    return free, (0, 0), (height - 1, width - 1)
+
+def _open_field(height, width, densidade, rng):
+    # Campo aberto com obstáculos retangulares cobrindo ~densidade da área
+    free = np.ones((height, width), dtype=bool)
+    max_side = max(1, min(height, width) // 10)
+    mean_area = ((max_side + 1) / 2) ** 2
+    count = int(densidade * height * width / mean_area)
+    hs = rng.integers(1, max_side + 1, count)
+    ws = rng.integers(1, max_side + 1, count)
+    rs = rng.integers(0, height, count)
+    cs = rng.integers(0, width, count)
+    for r, c, h, w in zip(rs, cs, hs, ws):
+        free[r:r + h, c:c + w] = False
+    return free, (0, 0), (height - 1, width - 1)
+
+_BUILDERS = {"random": _random_walls, "perfect": _perfect_maze, "rooms": _rooms, "open": _open_field}
+
+
+def _carve_path(free, start, goal, rng):
+    # Caminho monótono aleatório (sequência embaralhada de passos para baixo
+    # e para a direita) de start até goal
+    (sr, sc), (gr, gc) = start, goal
+    steps = np.zeros((gr - sr) + (gc - sc), dtype=bool)
+    steps[:gr - sr] = True
+    steps = rng.permutation(steps)
+    rows = sr + np.concatenate(([0], np.cumsum(steps)))
+    cols = sc + np.concatenate(([0], np.cumsum(~steps)))
+    free[rows, cols] = True
+
+def is_solvable(free, start, goal) -> bool:
+    maze = Maze.from_array(free, start, goal)
+    dist, _ = _wavefront(maze, [maze.start_id], maze.goal_id)
+    return bool(dist[maze.goal_id] >= 0)
+
+def make_grid(height: int, width: int, densidade: float = 0.25, topology: str = "random",
+              rng: Optional[np.random.Generator] = None, solvable: Optional[str] = None,
+              max_tries: int = 100):
+    """
+    Gera o grid de uma só vez com o gerador de números aleatórios do NumPy.
+    solvable: None (sem garantia), "carve" (abre um caminho de S a G) ou
+    "reject" (sorteia de novo até existir caminho, no máximo max_tries vezes).
+    Retorna (free, start, goal).
+    """
+    if topology not in _BUILDERS:
+        raise ValueError(f"Topologia desconhecida: {topology} (opções: {', '.join(TOPOLOGIES)})")
+    rng = rng if rng is not None else np.random.default_rng()
+    for _ in range(max_tries):
+        free, start, goal = _BUILDERS[topology](height, width, densidade, rng)
+        if solvable == "carve":
+            _carve_path(free, start, goal, rng)
+        free[start] = free[goal] = True
+        if solvable != "reject" or is_solvable(free, start, goal):
+            return free, start, goal
+    raise RuntimeError(f"Nenhum labirinto solúvel em {max_tries} tentativas")
+
+def terrain_costs(height: int, width: int, max_cost: int, rng: np.random.Generator,
+                  patch: int = 8) -> Optional[np.ndarray]:
+    """
+    Custos de terreno inteiros de 1 a max_cost em manchas patch x patch
+    (terreno real é correlacionado no espaço). None se max_cost <= 1.
+    """
+    if max_cost <= 1:
+        return None
+    coarse = rng.integers(1, max_cost + 1, (-(-height // patch), -(-width // patch)), dtype=np.uint8)
+    return np.repeat(np.repeat(coarse, patch, axis=0), patch, axis=1)[:height, :width]
+
+def save_grid(path, free, start, goal, fmt: str = "txt", costs=None):
+    if costs is not None:
+        costs = np.where(free, costs, 1)
+        costs[start] = costs[goal] = 1
+    if fmt == "bin":
+        write_binary(str(path), free, free.shape[0], free.shape[1], start, goal, costs=costs)
+    else:
+        write_text(str(path), free, start, goal, costs=costs)
+
+
+def generate_maze(width, height, densidade=0.25, nome_arquivo="labirinto.txt", topology="random",
+                  seed=None, output_dir=DATA_DIR, fmt="txt", solvable=None, max_cost=1):
+
+    rng = np.random.default_rng(seed)
+    free, start, goal = make_grid(height, width, densidade, topology, rng, solvable)
+    os.makedirs(output_dir, exist_ok=True)
+    caminho = os.path.join(output_dir, nome_arquivo)
+    save_grid(caminho, free, start, goal, fmt, terrain_costs(height, width, max_cost, rng))
     print(f"Labirinto salvo em {caminho}")
 
-if __name__ == "__main__":
-    random.seed(42)
-    tamanhos = [(5,5), (10,10), (15,15), (20,20)]
-    densidades = [0.2, 0.3]
 
-    for h, w in tamanhos:
+# ----------------------------------------------------------------------
+# Corpus: todas as combinações tamanho × densidade × topologia, em paralelo.
+# Cada labirinto usa a semente (seed, índice), então o corpus é o mesmo com
+# qualquer número de processos.
+# ----------------------------------------------------------------------
+def _corpus_task(task):
+    index, seed, path, height, width, densidade, topology, fmt, solvable, max_cost = task
+    rng = np.random.default_rng([seed, index])
+    free, start, goal = make_grid(height, width, densidade, topology, rng, solvable)
+    save_grid(path, free, start, goal, fmt, terrain_costs(height, width, max_cost, rng))
+    return path
+
+def generate_corpus(output_dir, sizes: Sequence[Tuple[int, int]], densidades: Sequence[float],
+                    topologies: Iterable[str] = ("random",), per_combo: int = 1, seed: int = 42,
+                    workers: Optional[int] = None, fmt: str = "txt",
+                    solvable: Optional[str] = None, max_cost: int = 1) -> List[str]:
+    os.makedirs(output_dir, exist_ok=True)
+    ext = BIN_SUFFIX if fmt == "bin" else ".txt"
+    tasks = []
+    for h, w in sizes:
         for d in densidades:
-            nome = f"labirinto_{h}x{w}_d{int(d*100)}.txt"
-            generate_maze(w, h, densidade=d, nome_arquivo=nome)
+            for topo in topologies:
+                for i in range(per_combo):
+                    nome = f"labirinto_{h}x{w}_d{int(round(d * 100))}"
+                    if topo != "random" or per_combo > 1:
+                        nome += f"_{topo}_{i:05d}"
+                    path = os.path.join(output_dir, nome + ext)
+                    tasks.append((len(tasks), seed, path, h, w, d, topo, fmt, solvable, max_cost))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_corpus_task(t) for t in tasks]
+    with ProcessPoolExecutor(workers) as pool:
+        return list(pool.map(_corpus_task, tasks, chunksize=max(1, len(tasks) // (8 * workers))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera labirintos (um corpus por tamanho × densidade × topologia)")
+    parser.add_argument("--output-dir", default=str(DATA_DIR))
+    parser.add_argument("--sizes", nargs="*", default=["5x5", "10x10", "15x15", "20x20"], help="ex.: 100x100")
+    parser.add_argument("--densities", nargs="*", type=float, default=[0.2, 0.3])
+    parser.add_argument("--topologies", nargs="*", default=["random"], choices=TOPOLOGIES)
+    parser.add_argument("--per-combo", type=int, default=1, help="labirintos por combinação")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--format", choices=["txt", "bin"], default="txt")
+    parser.add_argument("--solvable", choices=["carve", "reject"], default=None,
+                        help="garante caminho de S a G abrindo um caminho ou sorteando de novo")
+    parser.add_argument("--max-cost", type=int, default=1,
+                        help="custo máximo de terreno por célula (1 = sem custos; texto aceita até 9)")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(x) for x in s.lower().split("x")) for s in args.sizes]
+    paths = generate_corpus(args.output_dir, sizes, args.densities, args.topologies, args.per_combo,
+                            args.seed, args.workers, args.format, args.solvable, args.max_cost)
+    print(f"{len(paths)} labirintos salvos em {args.output_dir}")
@@ -1,10 +1,116 @@
-# src/heuristics.py
-from typing import Tuple
+from typing import Tuple, List, Optional
 Pos = Tuple[int,int]
 import math
+import os
+import tempfile
+from array import array
+from pathlib import Path
+import numpy as np
 
 def h_manhattan(a: Pos, b: Pos) -> float:
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
 def h_euclidean(a: Pos, b: Pos) -> float:
     return math.hypot(a[0] - b[0], a[1] - b[1])
+
+# ----------------------------------------------------------------------
+# Heurística de landmarks (ALT). Pela desigualdade triangular,
+# |d(L, a) - d(L, b)| <= d(a, b) para qualquer landmark L, então o máximo
+# sobre os landmarks (e Manhattan) continua admissível e consistente.
+# ----------------------------------------------------------------------
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "landmarks"
+_CACHE_VERSION = 2  # v1 escolhia os landmarks a partir de maze.start
+
+class LandmarkHeuristic:
+    """
+    Escolhe até n_landmarks células por seleção do ponto mais distante
+    (dentro da maior componente conexa do grid), guarda a distância exata de
+    cada landmark a todas as células em arrays int32 e persiste as tabelas em
+    cache_dir, indexadas pelo hash do grid. A escolha depende só das células,
+    não do início e do objetivo, então o cache vale para qualquer par de
+    extremos. Use como qualquer heurística: h(a, b).
+    """
+
+    def __init__(self, maze, n_landmarks: int = 8, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR):
+        self.W = maze.W
+        self.from_cache = False
+        cache_file = None
+        if cache_dir is not None:
+            cache_file = Path(cache_dir) / f"{maze.fingerprint()}_k{n_landmarks}_v{_CACHE_VERSION}.npz"
+            if cache_file.exists():
+                with np.load(cache_file) as data:
+                    landmarks, dist = data["landmarks"], data["dist"]
+                self.from_cache = True
+
+        if not self.from_cache:
+            landmarks, dist = self._select(maze, n_landmarks)
+            if cache_file is not None:
+                os.makedirs(cache_file.parent, exist_ok=True)
+                # nome temporário único: processos montando o mesmo labirinto
+                # não escrevem no mesmo arquivo antes do replace
+                fd, tmp = tempfile.mkstemp(dir=cache_file.parent, prefix=cache_file.stem + ".", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        np.savez_compressed(f, landmarks=landmarks, dist=dist)
+                    os.replace(tmp, cache_file)
+                except BaseException:
+                    os.unlink(tmp)
+                    raise
+
+        self.landmarks: List[Pos] = [divmod(int(c), maze.W) for c in landmarks]
+        self.tables = []
+        for row in dist:
+            t = array('i')
+            t.frombytes(row.astype(np.int32).tobytes())
+            self.tables.append(t)
+        self._goal = None
+        self._goal_dist = []
+
+    @staticmethod
+    def _select(maze, n_landmarks: int):
+        from search import distance_field
+        from components import label_components
+
+        # semente: primeira célula da maior componente (não depende de maze.start)
+        labels, n = label_components(np.frombuffer(maze.cells, dtype=np.uint8).reshape(maze.H, maze.W))
+        labels = labels.ravel()
+        seed = maze.start_id
+        if n > 0:
+            largest = int(np.argmax(np.bincount(labels[labels >= 0])))
+            seed = int(np.argmax(labels == largest))
+        d = distance_field(maze, [divmod(seed, maze.W)]).ravel()
+        landmarks, dist = [], []
+        nearest = d
+        for _ in range(n_landmarks):
+            cand = int(np.argmax(nearest))
+            if nearest[cand] <= 0 and landmarks:
+                break
+            landmarks.append(cand)
+            dl = distance_field(maze, [divmod(cand, maze.W)]).ravel()
+            dist.append(dl)
+            nearest = np.minimum(nearest, dl) if len(landmarks) > 1 else dl
+        return np.asarray(landmarks, dtype=np.int64), np.vstack(dist).astype(np.int32)
+
+    def __call__(self, a: Pos, b: Pos) -> float:
+        W = self.W
+        if b != self._goal:
+            gb = b[0] * W + b[1]
+            self._goal = b
+            self._goal_dist = [(t, t[gb]) for t in self.tables if t[gb] >= 0]
+        ca = a[0] * W + a[1]
+        best = abs(a[0] - b[0]) + abs(a[1] - b[1])
+        for t, db in self._goal_dist:
+            da = t[ca]
+            if da >= 0:
+                diff = da - db if da > db else db - da
+                if diff > best:
+                    best = diff
+        return best
+
+def landmark_heuristic(maze, n_landmarks: int = 8, cache_dir: Optional[Path] = DEFAULT_CACHE_DIR) -> LandmarkHeuristic:
+    """Heurística ALT do labirinto, reaproveitada entre buscas via maze.derived."""
+    key = ('landmarks', n_landmarks)
+    h = maze.derived.get(key)
+    if h is None:
+        h = maze.derived[key] = LandmarkHeuristic(maze, n_landmarks, cache_dir)
+    return h
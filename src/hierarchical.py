@@ -0,0 +1,340 @@
+# src/hierarchical.py
+import heapq
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from heuristics import h_manhattan
+from maze import Maze
+from search import SearchResult, _common_metrics_init, _known_unreachable, _unreachable, _masked_wavefront
+
+Pos = Tuple[int, int]
+INF = float('inf')
+
+# trechos de borda com pelo menos esse comprimento ganham duas transições
+# (uma em cada ponta); os menores, uma só, no meio
+LONG_ENTRANCE = 6
+
+
+class AbstractGraph:
+    """
+    Grafo abstrato do HPA*. O grid é dividido em clusters de cluster_size x
+    cluster_size células. Em cada borda entre dois clusters vizinhos, cada
+    trecho em que os dois lados estão livres vira uma entrada com uma ou duas
+    transições (pares de células vizinhas, uma de cada lado, ligadas por
+    custo 1). As células das transições são os nós do grafo; dentro de cada
+    cluster, nós ligados por um caminho que não sai do cluster ganham uma
+    aresta com o comprimento dele.
+
+    As distâncias internas saem de ondas vetorizadas (search._masked_wavefront)
+    sobre o grid com as ligações entre clusters cortadas: a k-ésima onda parte
+    do k-ésimo nó de todos os clusters ao mesmo tempo, sem que elas se
+    misturem. Mudanças de células (Maze.set_cells) refazem só os clusters que
+    contêm as células e, se a célula está numa borda, o cluster do outro lado.
+    """
+
+    def __init__(self, maze, cluster_size: int = 32):
+        if cluster_size < 2:
+            raise ValueError("cluster_size deve ser pelo menos 2")
+        self.cs = cluster_size
+        self.H, self.W = maze.H, maze.W
+        self.CH = -(-maze.H // cluster_size)
+        self.CW = -(-maze.W // cluster_size)
+        n = self.CH * self.CW
+        self.nodes: List[List[int]] = [[] for _ in range(n)]
+        self.dist: List[np.ndarray] = [np.zeros((0, 0), dtype=np.int32)] * n
+        self.index_of: Dict[int, int] = {}       # célula -> posição em nodes[cluster]
+        self.inter: Dict[int, List[int]] = {}    # célula -> células do outro lado
+        self.borders: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+        self.stats = {'clusters_built': 0, 'build_time': 0.0}
+        self._rebuild(maze, range(n))
+
+    # ------------------------------------------------------------------
+    # Geometria
+    # ------------------------------------------------------------------
+    def cluster_of(self, cell: int) -> int:
+        r, c = divmod(cell, self.W)
+        return (r // self.cs) * self.CW + c // self.cs
+
+    def bounds(self, cluster: int) -> Tuple[int, int, int, int]:
+        """(r0, c0, r1, c1) do cluster, com r1 e c1 exclusivos."""
+        cr, cc = divmod(cluster, self.CW)
+        cs = self.cs
+        return cr * cs, cc * cs, min((cr + 1) * cs, self.H), min((cc + 1) * cs, self.W)
+
+    # ------------------------------------------------------------------
+    # Construção
+    # ------------------------------------------------------------------
+    def _border(self, cells, a: int, b: int) -> List[Tuple[int, int]]:
+        # transições da borda entre os clusters vizinhos a < b
+        W = self.W
+        r0, c0, r1, c1 = self.bounds(a)
+        if b == a + self.CW:   # b abaixo de a
+            pairs = [((r1 - 1) * W + c, r1 * W + c) for c in range(c0, c1)]
+        else:                  # b à direita de a
+            pairs = [(r * W + c1 - 1, r * W + c1) for r in range(r0, r1)]
+        out, run = [], []
+        for x, y in pairs + [(-1, -1)]:
+            if x >= 0 and cells[x] and cells[y]:
+                run.append((x, y))
+                continue
+            if len(run) >= LONG_ENTRANCE:
+                out += [run[0], run[-1]]
+            elif run:
+                out.append(run[len(run) // 2])
+            run = []
+        return out
+
+    def _neighbors(self, a: int) -> List[int]:
+        # clusters vizinhos de a (esquerda, direita, acima, abaixo)
+        cr, cc = divmod(a, self.CW)
+        out = []
+        if cc > 0:
+            out.append(a - 1)
+        if cc + 1 < self.CW:
+            out.append(a + 1)
+        if cr > 0:
+            out.append(a - self.CW)
+        if cr + 1 < self.CH:
+            out.append(a + self.CW)
+        return out
+
+    def _rebuild(self, maze, clusters: Iterable[int]):
+        t0 = time.perf_counter()
+        todo = sorted(set(clusters))
+        if not todo:
+            return
+        in_todo = set(todo)
+
+        # só as bordas entre dois clusters refeitos podem ter mudado
+        for a in todo:
+            for b in self._neighbors(a):
+                if b < a or b not in in_todo:
+                    continue
+                for x, y in self.borders.pop((a, b), ()):
+                    for p, q in ((x, y), (y, x)):
+                        self.inter[p].remove(q)
+                        if not self.inter[p]:
+                            del self.inter[p]
+                new = self._border(maze.cells, a, b)
+                if new:
+                    self.borders[a, b] = new
+                for x, y in new:
+                    self.inter.setdefault(x, []).append(y)
+                    self.inter.setdefault(y, []).append(x)
+
+        for a in todo:
+            for x in self.nodes[a]:
+                del self.index_of[x]
+            members = set()
+            for b in self._neighbors(a):
+                for pair in self.borders.get((min(a, b), max(a, b)), ()):
+                    members.add(pair[0] if a < b else pair[1])
+            self.nodes[a] = sorted(members)
+            for i, x in enumerate(self.nodes[a]):
+                self.index_of[x] = i
+
+        self._intra_distances(maze, todo)
+        self.stats['clusters_built'] += len(todo)
+        self.stats['build_time'] += time.perf_counter() - t0
+
+    def _intra_distances(self, maze, todo: List[int]):
+        # recorte alinhado aos clusters que cobre todos os de todo
+        cs, W = self.cs, self.W
+        rows = [a // self.CW for a in todo]
+        cols = [a % self.CW for a in todo]
+        r0, c0 = min(rows) * cs, min(cols) * cs
+        r1, c1 = min((max(rows) + 1) * cs, self.H), min((max(cols) + 1) * cs, W)
+        ww = c1 - c0
+        free = np.frombuffer(maze.cells, dtype=np.uint8).reshape(self.H, W)[r0:r1, c0:c1].astype(bool)
+        mask = Maze._neighbor_masks(free)
+        # corta as ligações entre clusters diferentes
+        rr = np.arange(r0, r1)
+        cc = np.arange(c0, c1)
+        mask[(rr % cs == 0), :] &= ~np.uint8(1)
+        mask[(rr % cs == cs - 1), :] &= ~np.uint8(2)
+        mask[:, (cc % cs == 0)] &= ~np.uint8(4)
+        mask[:, (cc % cs == cs - 1)] &= ~np.uint8(8)
+        mask = mask.ravel()
+
+        sizes = np.array([len(self.nodes[a]) for a in todo])
+        K = int(sizes.max()) if len(todo) else 0
+        local = np.zeros((len(todo), max(K, 1)), dtype=np.int64)
+        for t, a in enumerate(todo):
+            for i, x in enumerate(self.nodes[a]):
+                r, c = divmod(x, W)
+                local[t, i] = (r - r0) * ww + c - c0
+        table = np.full((len(todo), K, K), -1, dtype=np.int32)
+        for k in range(K):
+            has = sizes > k
+            dist, _ = _masked_wavefront(mask, ww, local[has, k])
+            table[has, k, :] = dist[local[has]]
+        for t, a in enumerate(todo):
+            n = sizes[t]
+            self.dist[a] = table[t, :n, :n].copy()
+
+    def cells_changed(self, maze, ids) -> bool:
+        cs, H, W, CW = self.cs, self.H, self.W, self.CW
+        touched = set()
+        for x in ids:
+            r, c = divmod(x, W)
+            a = self.cluster_of(x)
+            touched.add(a)
+            if r % cs == 0 and r > 0:
+                touched.add(a - CW)
+            if r % cs == cs - 1 and r + 1 < H:
+                touched.add(a + CW)
+            if c % cs == 0 and c > 0:
+                touched.add(a - 1)
+            if c % cs == cs - 1 and c + 1 < W:
+                touched.add(a + 1)
+        self._rebuild(maze, touched)
+        return True
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def edges(self, cell: int) -> List[Tuple[int, int]]:
+        """Arestas (vizinho, custo) do nó cell no grafo abstrato."""
+        out = [(y, 1) for y in self.inter.get(cell, ())]
+        a = self.cluster_of(cell)
+        i = self.index_of.get(cell)
+        if i is not None:
+            nodes = self.nodes[a]
+            for j, d in enumerate(self.dist[a][i].tolist()):
+                if d > 0:
+                    out.append((nodes[j], d))
+        return out
+
+    def n_nodes(self) -> int:
+        return len(self.index_of)
+
+
+def hpa_graph(maze, cluster_size: int = 32) -> AbstractGraph:
+    """Grafo abstrato do labirinto, montado uma vez e guardado em maze.derived."""
+    key = ('hpa', cluster_size)
+    graph = maze.derived.get(key)
+    if graph is None:
+        graph = maze.derived[key] = AbstractGraph(maze, cluster_size)
+    return graph
+
+
+def _cluster_bfs(maze, graph: AbstractGraph, src: int, target: int = -1):
+    # BFS sem sair do cluster de src; devolve (distâncias, pais, expandidos)
+    r0, c0, r1, c1 = graph.bounds(graph.cluster_of(src))
+    moves, mask, W = maze.moves, maze.nbr_mask, maze.W
+    dist = {src: 0}
+    parent = {src: -1}
+    frontier = [src]
+    expanded = 0
+    d = 0
+    while frontier and target not in dist:
+        d += 1
+        nxt = []
+        for u in frontier:
+            expanded += 1
+            for off in moves[mask[u]]:
+                q = u + off
+                if q in dist:
+                    continue
+                r, c = divmod(q, W)
+                if r0 <= r < r1 and c0 <= c < c1:
+                    dist[q] = d
+                    parent[q] = u
+                    nxt.append(q)
+        frontier = nxt
+    return dist, parent, expanded
+
+
+def hpa_star_search(maze, heuristic: Callable[[Pos, Pos], float] = h_manhattan,
+                    cluster_size: int = 32) -> SearchResult:
+    """
+    HPA*: busca A* no grafo abstrato (hpa_graph) e depois refina só os
+    trechos escolhidos, com BFS dentro de um cluster por trecho. Início e
+    objetivo entram no grafo por BFS dentro dos seus clusters.
+
+    O caminho é quase ótimo (as transições ficam em posições fixas das
+    entradas); metrics['abstract_cost'] é o custo previsto no grafo
+    abstrato, igual ao do caminho refinado. A montagem do grafo não entra no
+    tempo (fica em hpa_graph(maze).stats['build_time']).
+    """
+    metrics = _common_metrics_init()
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    graph = hpa_graph(maze, cluster_size)
+    start_time = time.perf_counter()
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    W, goal_pos = maze.W, maze.goal
+    from_start, _, exp_s = _cluster_bfs(maze, graph, s)
+    to_goal, _, exp_g = _cluster_bfs(maze, graph, goal)
+    local_expanded = exp_s + exp_g
+    start_nodes = [(x, d) for x, d in from_start.items() if x in graph.index_of or x == goal]
+
+    # A* no grafo abstrato
+    g_score = {s: 0}
+    parent = {s: -1}
+    # entradas (f, -g, nó): nos empates de f, o nó mais fundo primeiro
+    open_list = [(heuristic(maze.start, goal_pos), 0, s)]
+    closed = set()
+    generated = expanded = 0
+    max_frontier = 1
+    while open_list:
+        f, gu, u = heapq.heappop(open_list)
+        gu = -gu
+        if u in closed or gu > g_score[u]:
+            continue
+        closed.add(u)
+        expanded += 1
+        if u == goal:
+            break
+        out = start_nodes + [(y, 1) for y in graph.inter.get(s, ())] if u == s else graph.edges(u)
+        if u in to_goal and u != s:
+            out = out + [(goal, to_goal[u])]
+        for v, d in out:
+            generated += 1
+            gv = gu + d
+            if gv < g_score.get(v, INF):
+                g_score[v] = gv
+                parent[v] = u
+                heapq.heappush(open_list, (gv + heuristic(divmod(v, W), goal_pos), -gv, v))
+        if len(open_list) > max_frontier:
+            max_frontier = len(open_list)
+
+    if goal not in closed:
+        metrics.update(nodes_generated=generated, nodes_expanded=expanded + local_expanded,
+                       max_frontier_size=max_frontier, max_explored_size=len(closed),
+                       abstract_expanded=expanded, refine_expanded=local_expanded)
+        return SearchResult(False, [], INF, time.perf_counter() - start_time, metrics)
+
+    # refinamento: cada aresta abstrata vira um trecho de células
+    abstract = []
+    u = goal
+    while u != -1:
+        abstract.append(u)
+        u = parent[u]
+    abstract.reverse()
+    path = [s]
+    refine_expanded = 0
+    for a, b in zip(abstract, abstract[1:]):
+        if graph.cluster_of(a) != graph.cluster_of(b):
+            path.append(b)
+            continue
+        _, par, exp = _cluster_bfs(maze, graph, a, b)
+        refine_expanded += exp
+        seg = []
+        x = b
+        while x != a:
+            seg.append(x)
+            x = par[x]
+        path.extend(reversed(seg))
+
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded + local_expanded + refine_expanded,
+                   max_frontier_size=max_frontier, max_explored_size=len(closed),
+                   abstract_expanded=expanded, refine_expanded=refine_expanded + local_expanded,
+                   abstract_path_nodes=len(abstract), abstract_cost=float(g_score[goal]))
+    elapsed = time.perf_counter() - start_time
+    return SearchResult(True, [divmod(x, W) for x in path], float(len(path) - 1), elapsed, metrics)
@@ -0,0 +1,95 @@
+# src/indexed_heap.py
+from array import array
+
+
+class IndexedHeap:
+    """
+    Heap binário mínimo de células (ids inteiros) com decrease-key: cada
+    célula aparece no máximo uma vez, e empilhar uma célula que já está no
+    heap só atualiza a prioridade dela. A prioridade é o par (key, tie),
+    comparado em ordem lexicográfica; tie desempata f iguais.
+
+    O armazenamento é todo em arrays: células, keys e ties em arrays
+    paralelos que crescem com o heap (16 bytes por entrada), e a posição de
+    cada célula no heap num array pré-alocado do tamanho do grid.
+    """
+    __slots__ = ('cells', 'keys', 'ties', 'pos')
+
+    def __init__(self, n: int):
+        self.cells = array('i')
+        self.keys = array('d')
+        self.ties = array('d')
+        self.pos = array('i', [-1]) * n
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def __contains__(self, cell: int) -> bool:
+        return self.pos[cell] >= 0
+
+    def push(self, cell: int, key: float, tie: float = 0.0):
+        """Insere a célula ou, se ela já estiver no heap, troca a sua prioridade."""
+        i = self.pos[cell]
+        if i < 0:
+            i = len(self.cells)
+            self.cells.append(cell)
+            self.keys.append(key)
+            self.ties.append(tie)
+            self._sift_up(i, cell, key, tie)
+            return
+        old_key, old_tie = self.keys[i], self.ties[i]
+        if key < old_key or (key == old_key and tie < old_tie):
+            self._sift_up(i, cell, key, tie)
+        else:
+            self._sift_down(i, cell, key, tie)
+
+    def pop(self) -> int:
+        """Remove e devolve a célula de menor prioridade."""
+        cells = self.cells
+        top = cells[0]
+        last, key, tie = cells.pop(), self.keys.pop(), self.ties.pop()
+        self.pos[top] = -1
+        if cells:
+            self._sift_down(0, last, key, tie)
+        return top
+
+    def peek_key(self) -> float:
+        return self.keys[0]
+
+    def _sift_up(self, i: int, cell: int, key: float, tie: float):
+        cells, keys, ties, pos = self.cells, self.keys, self.ties, self.pos
+        while i > 0:
+            p = (i - 1) >> 1
+            pk = keys[p]
+            if key < pk or (key == pk and tie < ties[p]):
+                c = cells[p]
+                cells[i], keys[i], ties[i] = c, pk, ties[p]
+                pos[c] = i
+                i = p
+            else:
+                break
+        cells[i], keys[i], ties[i] = cell, key, tie
+        pos[cell] = i
+
+    def _sift_down(self, i: int, cell: int, key: float, tie: float):
+        cells, keys, ties, pos = self.cells, self.keys, self.ties, self.pos
+        n = len(cells)
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            ck, ct = keys[child], ties[child]
+            right = child + 1
+            if right < n:
+                rk = keys[right]
+                if rk < ck or (rk == ck and ties[right] < ct):
+                    child, ck, ct = right, rk, ties[right]
+            if ck < key or (ck == key and ct < tie):
+                c = cells[child]
+                cells[i], keys[i], ties[i] = c, ck, ct
+                pos[c] = i
+                i = child
+            else:
+                break
+        cells[i], keys[i], ties[i] = cell, key, tie
+        pos[cell] = i
@@ -0,0 +1,106 @@
+# src/instrumentation.py
+from typing import Tuple, Dict, Sequence, Union
+
+Pos = Tuple[int, int]
+
+
+class SearchHooks:
+    """
+    Ganchos de eventos das buscas. Sobrescreva só os métodos de interesse:
+    os que não forem sobrescritos nem chegam a ser chamados. Sem ganchos
+    (hooks=None) as buscas usam o laço rápido, sem nenhuma instrumentação.
+
+    Com profile_phases = True a busca mede quanto tempo gasta em cada fase
+    (heurística, geração de vizinhos, operações na fronteira) e entrega os
+    totais em on_phase_times e em metrics['phase_times'].
+    """
+    profile_phases = False
+
+    def on_expand(self, cell: Pos, g: float):
+        pass
+
+    def on_generate(self, parent: Pos, child: Pos):
+        pass
+
+    def on_goal(self, result):
+        pass
+
+    def on_phase_times(self, times: Dict[str, float]):
+        pass
+
+
+class HookChain(SearchHooks):
+    """Combina vários ganchos; cada evento vai para os que o implementam."""
+
+    def __init__(self, *hooks: SearchHooks):
+        self.hooks = hooks
+        self.profile_phases = any(h.profile_phases for h in hooks)
+        for name in ("on_expand", "on_generate", "on_goal", "on_phase_times"):
+            targets = [getattr(h, name) for h in hooks if overrides(h, name)]
+            if targets:
+                setattr(self, name, self._fan_out(targets))
+
+    @staticmethod
+    def _fan_out(targets):
+        def call(*args):
+            for t in targets:
+                t(*args)
+        return call
+
+
+def overrides(hooks: SearchHooks, name: str) -> bool:
+    """True se `hooks` implementa o evento `name` (não é o método vazio da base)."""
+    if name in vars(hooks):
+        return True
+    return getattr(type(hooks), name, None) is not getattr(SearchHooks, name)
+
+def as_hooks(hooks: Union[SearchHooks, Sequence[SearchHooks]]) -> SearchHooks:
+    if isinstance(hooks, SearchHooks):
+        return hooks
+    return HookChain(*hooks)
+
+
+class PhaseProfiler(SearchHooks):
+    """Acumula os tempos por fase de todas as buscas em que for usado."""
+    profile_phases = True
+
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+        self.runs = 0
+
+    def on_phase_times(self, times: Dict[str, float]):
+        self.runs += 1
+        for phase, t in times.items():
+            self.totals[phase] = self.totals.get(phase, 0.0) + t
+
+
+class ExpansionTrace(SearchHooks):
+    """
+    Grava a ordem de expansão (ordem, linha, coluna, g) em CSV para análise
+    ou animação. sample_every=k guarda só uma a cada k expansões.
+    """
+
+    def __init__(self, path: str, sample_every: int = 1):
+        self.path = path
+        self.sample_every = max(1, sample_every)
+        self.order = 0
+        self._file = None
+
+    def on_expand(self, cell: Pos, g: float):
+        if self.order % self.sample_every == 0:
+            if self._file is None:
+                self._file = open(self.path, "w", encoding="utf-8")
+                self._file.write("order,row,col,g\n")
+            self._file.write(f"{self.order},{cell[0]},{cell[1]},{g}\n")
+        self.order += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,24 +1,242 @@
-# src/maze.py
-from typing import List, Tuple, Iterable, Optional
+from typing import List, Tuple, Iterable, Optional, Sequence, Union
+import copy
+import hashlib
+import struct
+import numpy as np
 
-Grid = List[List[str]]
+Grid = Sequence[Union[str, List[str]]]
 Pos = Tuple[int, int]
 
+WALL = ord('#')
+
+# Ações na mesma ordem usada por Maze.actions; o bit k da máscara de vizinhança
+# indica que a ação ACTIONS[k] leva a uma célula livre.
+ACTIONS = ('N', 'S', 'O', 'L')
+DELTAS = {'N': (-1, 0), 'S': (1, 0), 'O': (0, -1), 'L': (0, 1)}
+_ACTION_BIT = {a: 1 << k for k, a in enumerate(ACTIONS)}
+_ACTIONS_BY_MASK = tuple(
+    tuple(a for k, a in enumerate(ACTIONS) if m & (1 << k)) for m in range(16)
+)
+
+
 class Maze:
-    
+    """
+    Labirinto em grid 4-conexo.
+
+    Internamente cada célula é identificada por um id inteiro (r * W + c).
+    A passabilidade fica num bytearray plano (1 = livre) e a vizinhança numa
+    tabela de máscaras de 4 bits por célula, montada uma única vez na carga.
+    As buscas usam `neighbors`/`moves` direto; `actions`/`result` continuam
+    disponíveis como camada de compatibilidade baseada em tuplas (r, c).
+
+    Terreno: cada célula livre pode ter um custo inteiro de entrada (no texto,
+    os dígitos 1-9; '.', 'S' e 'G' custam 1, e início e objetivo sempre custam
+    1). `costs` é um bytearray por
+    célula, ou None quando todas custam 1. Só as buscas de custo uniforme
+    (uniform_cost_search, dial_search) usam os custos; as demais tratam o
+    grid como de custo unitário.
+    """
+
     def __init__(self, grid: Grid):
-        self.grid = grid
-        self.H = len(grid)
-        self.W = len(grid[0]) if self.H > 0 else 0
-        self.start = self._find('S')
-        self.goal = self._find('G')
-
-    def _find(self, ch: str) -> Pos:
-        for r in range(self.H):
-            for c in range(self.W):
-                if self.grid[r][c] == ch:
-                    return (r, c)
-        raise ValueError(f"Caractere '{ch}' não encontrado no grid")
+        rows = [r if isinstance(r, str) else ''.join(r) for r in grid]
+        H = len(rows)
+        W = len(rows[0]) if H > 0 else 0
+        if any(len(r) != W for r in rows):
+            raise ValueError("Todas as linhas do grid devem ter o mesmo tamanho")
+        raw = np.frombuffer(''.join(rows).encode('ascii', errors='replace'), dtype=np.uint8)
+        self._load(raw.reshape(H, W))
+
+    def _load(self, raw: np.ndarray):
+        H, W = raw.shape
+        self._init_shape(H, W, self._find(raw, 'S'), self._find(raw, 'G'))
+        self._set_free(raw != WALL)
+        digits = (raw >= ord('1')) & (raw <= ord('9'))
+        self._set_costs(np.where(digits, raw - ord('0'), 1) if (raw[digits] > ord('1')).any() else None)
+
+    def _set_free(self, free: np.ndarray):
+        self.cells = bytearray(free.astype(np.uint8).tobytes())
+        self.nbr_mask = bytearray(self._neighbor_masks(free).tobytes())
+
+    def _set_costs(self, costs: Optional[np.ndarray]):
+        if costs is not None:
+            costs = np.asarray(costs)
+            if costs.shape != (self.H, self.W) and costs.shape != (self.N,):
+                raise ValueError("O array de custos deve ter o formato do grid")
+            if costs.min() < 1 or costs.max() > 255:
+                raise ValueError("Custos devem ser inteiros entre 1 e 255")
+            if (costs == 1).all():
+                costs = None
+        self.costs = None if costs is None else bytearray(costs.astype(np.uint8).tobytes())
+
+    @staticmethod
+    def from_array(free: np.ndarray, start: Pos, goal: Pos, costs: Optional[np.ndarray] = None) -> "Maze":
+        """
+        Monta um labirinto a partir de um array H x W booleano (verdadeiro =
+        livre) e, opcionalmente, de um array H x W de custos inteiros.
+        """
+        free = np.asarray(free, dtype=bool)
+        maze = Maze.__new__(Maze)
+        maze._init_shape(free.shape[0], free.shape[1], tuple(start), tuple(goal))
+        maze._set_free(free)
+        if costs is not None:
+            costs = np.where(free, costs, 1)
+            costs[tuple(start)] = costs[tuple(goal)] = 1
+        maze._set_costs(costs)
+        return maze
+
+    def _init_shape(self, H: int, W: int, start: Pos, goal: Pos):
+        self.H, self.W = H, W
+        self.N = H * W
+        self.start, self.goal = start, goal
+        self.start_id = self.cell_id(start)
+        self.goal_id = self.cell_id(goal)
+        # deslocamento do id para cada combinação de vizinhos livres
+        self.moves = tuple(
+            tuple(d for k, d in enumerate((-W, W, -1, 1)) if m & (1 << k))
+            for m in range(16)
+        )
+        # estruturas derivadas do grid (tabelas de salto, índices, ...),
+        # montadas sob demanda pelos módulos de busca e reaproveitadas
+        self.derived = {}
+
+    @staticmethod
+    def _neighbor_masks(free: np.ndarray) -> np.ndarray:
+        mask = np.zeros(free.shape, dtype=np.uint8)
+        mask[1:, :] |= free[:-1, :] * np.uint8(1)   # N
+        mask[:-1, :] |= free[1:, :] * np.uint8(2)   # S
+        mask[:, 1:] |= free[:, :-1] * np.uint8(4)   # O
+        mask[:, :-1] |= free[:, 1:] * np.uint8(8)   # L
+        return mask
+
+    @staticmethod
+    def _find(raw: np.ndarray, ch: str) -> Pos:
+        hits = np.flatnonzero(raw == ord(ch))
+        if hits.size == 0:
+            raise ValueError(f"Caractere '{ch}' não encontrado no grid")
+        r, c = divmod(int(hits[0]), raw.shape[1])
+        return (r, c)
+
+    # ------------------------------------------------------------------
+    # Caminho rápido: ids inteiros
+    # ------------------------------------------------------------------
+    def cell_id(self, p: Pos) -> int:
+        return p[0] * self.W + p[1]
+
+    def pos(self, cell: int) -> Pos:
+        return divmod(cell, self.W)
+
+    def neighbors(self, cell: int) -> List[int]:
+        return [cell + d for d in self.moves[self.nbr_mask[cell]]]
+
+    @property
+    def max_cost(self) -> int:
+        return max(self.costs) if self.costs is not None else 1
+
+    def with_endpoints(self, start: Pos, goal: Pos) -> "Maze":
+        """
+        Visão do mesmo labirinto com outro início/objetivo. Os arrays do grid e
+        as estruturas derivadas são compartilhados, nada é copiado.
+        """
+        for p in (start, goal):
+            if not (self.in_bounds(p) and self.passable(p)):
+                raise ValueError(f"Posição {p} fora do grid ou bloqueada")
+        view = copy.copy(self)
+        view.start, view.goal = tuple(start), tuple(goal)
+        view.start_id, view.goal_id = self.cell_id(start), self.cell_id(goal)
+        return view
+
+    def set_cells(self, changes: Iterable[Tuple[Pos, bool]]) -> List[int]:
+        """
+        Altera o labirinto no lugar. Cada mudança é (posição, parede?).
+        Atualiza a passabilidade e as máscaras de vizinhança das células
+        afetadas e avisa as estruturas em `derived`: as que têm um método
+        `cells_changed(maze, ids)` que devolve True se atualizam sozinhas, as
+        demais são descartadas. Retorna os ids que de fato mudaram.
+        """
+        W, H = self.W, self.H
+        changed = []
+        for p, wall in changes:
+            if not self.in_bounds(p):
+                raise ValueError(f"Posição {p} fora do grid")
+            if wall and tuple(p) in (self.start, self.goal):
+                raise ValueError("Início e objetivo não podem virar parede")
+            x = p[0] * W + p[1]
+            if self.cells[x] == (0 if wall else 1):
+                continue
+            self.cells[x] = 0 if wall else 1
+            r, c = p
+            # bit, na máscara do vizinho, que aponta de volta para x
+            for ok, y, bit in ((r + 1 < H, x + W, 1), (r > 0, x - W, 2),
+                               (c + 1 < W, x + 1, 4), (c > 0, x - 1, 8)):
+                if ok:
+                    if wall:
+                        self.nbr_mask[y] &= ~bit & 0xF
+                    else:
+                        self.nbr_mask[y] |= bit
+            changed.append(x)
+
+        if changed:
+            for key, obj in list(self.derived.items()):
+                hook = getattr(obj, 'cells_changed', None)
+                if hook is None or not hook(self, changed):
+                    del self.derived[key]
+        return changed
+
+    def set_wall(self, p: Pos, wall: bool = True) -> bool:
+        return bool(self.set_cells([(p, wall)]))
+
+    def set_costs(self, changes: Iterable[Tuple[Pos, int]]):
+        """
+        Altera o custo de entrada de células (posição, custo). As estruturas
+        em `derived` dependem só da passabilidade e são mantidas, menos o
+        `grid` em caracteres, que mostra os custos.
+        """
+        for p, cost in changes:
+            if not self.in_bounds(p):
+                raise ValueError(f"Posição {p} fora do grid")
+            if not 1 <= cost <= 255:
+                raise ValueError("Custos devem ser inteiros entre 1 e 255")
+            if cost != 1 and tuple(p) in (self.start, self.goal):
+                raise ValueError("Início e objetivo sempre custam 1")
+            if self.costs is None:
+                if cost == 1:
+                    continue
+                self.costs = bytearray(b'\x01') * self.N
+            self.costs[p[0] * self.W + p[1]] = cost
+        for key in [k for k in self.derived if isinstance(k, tuple) and k[0] == 'grid']:
+            del self.derived[key]
+
+    def fingerprint(self) -> str:
+        """Hash da passabilidade do grid (não depende de S e G)."""
+        h = hashlib.sha1(f"{self.H}x{self.W}:".encode())
+        h.update(self.cells)
+        return h.hexdigest()
+
+    # ------------------------------------------------------------------
+    # API de compatibilidade baseada em tuplas (r, c)
+    # ------------------------------------------------------------------
+    @property
+    def grid(self) -> Tuple[Tuple[str, ...], ...]:
+        """
+        O grid em caracteres, montado no primeiro acesso e guardado em
+        `derived` (descartado por `set_cells`/`set_costs`). É só leitura:
+        as linhas são tuplas, e mudanças passam por `set_cells`/`set_costs`.
+        """
+        key = ('grid', self.start, self.goal)
+        g = self.derived.get(key)
+        if g is None:
+            W = self.W
+            rows = [['.' if self.cells[r * W + c] else '#' for c in range(W)] for r in range(self.H)]
+            if self.costs is not None:
+                for r in range(self.H):
+                    for c in range(W):
+                        cost = self.costs[r * W + c]
+                        if cost > 1 and rows[r][c] == '.':
+                            rows[r][c] = str(cost) if cost <= 9 else '9'
+            rows[self.start[0]][self.start[1]] = 'S'
+            rows[self.goal[0]][self.goal[1]] = 'G'
+            g = self.derived[key] = tuple(tuple(row) for row in rows)
+        return g
 
     def in_bounds(self, p: Pos) -> bool:
         r, c = p
@@ -26,41 +244,170 @@ class Maze:
 
     def passable(self, p: Pos) -> bool:
         r, c = p
-        return self.grid[r][c] != '#'
+        return self.cells[r * self.W + c] == 1
 
     def actions(self, p: Pos) -> List[str]:
-        acts = []
-        r, c = p
-        candidates = {
-            'N': (r-1, c),
-            'S': (r+1, c),
-            'O': (r, c-1),
-            'L': (r, c+1),
-        }
-        for a, q in candidates.items():
-            if self.in_bounds(q) and self.passable(q):
-                acts.append(a)
-        return acts
+        return list(_ACTIONS_BY_MASK[self.nbr_mask[p[0] * self.W + p[1]]])
 
     def result(self, p: Pos, a: str) -> Pos:
-        r, c = p
-        delta = {'N':(-1,0), 'S':(1,0), 'O':(0,-1), 'L':(0,1)}
-        if a not in delta:
+        if a not in DELTAS:
             raise ValueError("Ação inválida")
-        dr, dc = delta[a]
-        q = (r+dr, c+dc)
-        if not (self.in_bounds(q) and self.passable(q)):
+        r, c = p
+        if not (self.in_bounds(p) and self.nbr_mask[r * self.W + c] & _ACTION_BIT[a]):
             raise ValueError("Ação inválida em p")
-        return q
+        dr, dc = DELTAS[a]
+        return (r + dr, c + dc)
 
     def step_cost(self, p: Pos, a: str, q: Pos) -> float:
-        return 1.0
+        if self.costs is None:
+            return 1.0
+        return float(self.costs[q[0] * self.W + q[1]])
+
+    def _cost_array(self) -> Optional[np.ndarray]:
+        if self.costs is None:
+            return None
+        return np.frombuffer(self.costs, dtype=np.uint8).reshape(self.H, self.W)
 
     def goal_test(self, p: Pos) -> bool:
         return p == self.goal
 
+    def to_text(self, path: str):
+        free = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.H, self.W)
+        write_text(path, free, self.start, self.goal, costs=self._cost_array())
+
+    def to_binary(self, path: str):
+        """Grava no formato binário compacto (ver PackedMaze)."""
+        write_binary(path, np.frombuffer(self.cells, dtype=np.uint8), self.H, self.W, self.start, self.goal,
+                     costs=self._cost_array())
+
     @staticmethod
     def from_file(path: str) -> "Maze":
-        with open(path, 'r', encoding='utf-8') as f:
-            lines = [list(line.rstrip('\n')) for line in f if line.strip() != ""]
-        return Maze(lines)
+        """Carrega um labirinto em texto (.txt) ou no formato binário compacto."""
+        with open(path, 'rb') as f:
+            if f.read(len(BIN_MAGIC)) == BIN_MAGIC:
+                return PackedMaze(path)
+            f.seek(0)
+            lines = [line.rstrip(b'\r\n') for line in f if line.strip() != b""]
+        H = len(lines)
+        W = len(lines[0]) if H > 0 else 0
+        if any(len(r) != W for r in lines):
+            raise ValueError("Todas as linhas do grid devem ter o mesmo tamanho")
+        maze = Maze.__new__(Maze)
+        maze._load(np.frombuffer(b''.join(lines), dtype=np.uint8).reshape(H, W))
+        return maze
+
+
+# ----------------------------------------------------------------------
+# Formato binário: cabeçalho fixo + 1 bit por célula (1 = livre), em ordem
+# de linhas, bits menos significativos primeiro. Com a flag BIN_FLAG_COSTS,
+# segue 1 byte (u8) de custo por célula, também em ordem de linhas.
+#   magic "MAZB" | versão u8 | flags u8 | 2 bytes livres | H, W, S(r, c), G(r, c) u32
+# ----------------------------------------------------------------------
+BIN_MAGIC = b"MAZB"
+BIN_SUFFIX = ".mazb"
+BIN_VERSION = 1
+BIN_FLAG_COSTS = 1
+BIN_HEADER = '<4sBB2xIIIIII'
+BIN_HEADER_SIZE = struct.calcsize(BIN_HEADER)
+
+
+def write_text(path: str, free: np.ndarray, start: Pos, goal: Pos, block_rows: int = 1024,
+               costs: Optional[np.ndarray] = None):
+    """
+    Grava um grid H x W (verdadeiro = livre) no formato texto, em blocos de
+    linhas. Custos maiores que 1 viram dígitos (no máximo 9).
+    """
+    H, W = free.shape
+    if costs is not None and np.asarray(costs).max() > 9:
+        raise ValueError("O formato texto só representa custos de 1 a 9; use o formato binário")
+    with open(path, 'wb') as f:
+        for r0 in range(0, H, block_rows):
+            block = free[r0:r0 + block_rows]
+            out = np.empty((block.shape[0], W + 1), dtype=np.uint8)
+            out[:, :-1] = np.where(block, np.uint8(ord('.')), np.uint8(WALL))
+            if costs is not None:
+                cb = costs[r0:r0 + block_rows]
+                weighted = (block != 0) & (cb > 1)
+                out[:, :-1][weighted] = cb[weighted] + ord('0')
+            out[:, -1] = ord('\n')
+            for ch, (r, c) in (('S', start), ('G', goal)):
+                if r0 <= r < r0 + block.shape[0]:
+                    out[r - r0, c] = ord(ch)
+            out.tofile(f)
+
+def write_binary(path: str, free: np.ndarray, H: int, W: int, start: Pos, goal: Pos,
+                 costs: Optional[np.ndarray] = None):
+    """Grava células (verdadeiro = livre, em ordem de linhas) e custos opcionais no formato binário."""
+    flags = BIN_FLAG_COSTS if costs is not None else 0
+    header = struct.pack(BIN_HEADER, BIN_MAGIC, BIN_VERSION, flags, H, W, *start, *goal)
+    bits = np.packbits(np.asarray(free, dtype=bool).ravel(), bitorder='little')
+    with open(path, 'wb') as f:
+        f.write(header)
+        bits.tofile(f)
+        if costs is not None:
+            np.asarray(costs, dtype=np.uint8).ravel().tofile(f)
+
+
+class PackedMaze(Maze):
+    """
+    Labirinto lido de um arquivo binário por memory-map, sem cópia: abrir o
+    arquivo só lê o cabeçalho. `passable` consulta o bitmap direto no disco;
+    os arrays de 1 byte por célula usados pelas buscas (`cells`, `nbr_mask`)
+    só são montados no primeiro acesso.
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            header = f.read(BIN_HEADER_SIZE)
+        if len(header) < BIN_HEADER_SIZE:
+            raise ValueError(f"Arquivo binário truncado: {path}")
+        magic, version, flags, H, W, sr, sc, gr, gc = struct.unpack(BIN_HEADER, header)
+        if magic != BIN_MAGIC or version != BIN_VERSION:
+            raise ValueError(f"Formato binário não suportado: {path}")
+        self.path = path
+        self._init_shape(H, W, (sr, sc), (gr, gc))
+        nbytes = (H * W + 7) // 8
+        self.bits = np.memmap(path, dtype=np.uint8, mode='r', offset=BIN_HEADER_SIZE, shape=(nbytes,))
+        self.cost_map = None
+        if flags & BIN_FLAG_COSTS:
+            self.cost_map = np.memmap(path, dtype=np.uint8, mode='r', offset=BIN_HEADER_SIZE + nbytes,
+                                      shape=(H * W,))
+        self._cells = None
+        self._nbr_mask = None
+        self._costs = None
+
+    @property
+    def cells(self) -> bytearray:
+        if self._cells is None:
+            free = np.unpackbits(self.bits, count=self.N, bitorder='little')
+            self._cells = bytearray(free.tobytes())
+        return self._cells
+
+    @property
+    def nbr_mask(self) -> bytearray:
+        if self._nbr_mask is None:
+            free = np.frombuffer(self.cells, dtype=np.uint8).reshape(self.H, self.W).astype(bool)
+            self._nbr_mask = bytearray(self._neighbor_masks(free).tobytes())
+        return self._nbr_mask
+
+    @property
+    def costs(self) -> Optional[bytearray]:
+        if self._costs is None and self.cost_map is not None:
+            self._costs = bytearray(self.cost_map.tobytes())
+        return self._costs
+
+    @costs.setter
+    def costs(self, value: Optional[bytearray]):
+        self._costs = value
+        self.cost_map = None
+
+    def passable(self, p: Pos) -> bool:
+        if self._cells is not None:
+            return super().passable(p)
+        i = p[0] * self.W + p[1]
+        return bool(self.bits[i >> 3] >> (i & 7) & 1)
+
+    def with_endpoints(self, start: Pos, goal: Pos) -> "Maze":
+        # materializa antes de copiar, para que as visões compartilhem os arrays
+        self.cells, self.nbr_mask, self.costs
+        return super().with_endpoints(start, goal)
@@ -0,0 +1,395 @@
+# src/path_service.py
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from maze import Maze
+from components import component_index
+from algorithms import ALGORITHMS_BY_NAME as _ALGORITHMS_BY_NAME
+
+DEFAULT_ALGORITHM = "A*-Manhattan"
+LINE_LIMIT = 2**26  # linhas JSON com caminhos longos passam do limite padrão (64 KiB)
+
+
+class MazeCache:
+    """
+    Cache LRU de labirintos carregados por caminho de arquivo. O labirinto
+    guardado leva junto as estruturas pré-computadas em maze.derived (índice
+    de componentes, tabelas JPS+, landmarks, grafo HPA*); um arquivo alterado
+    no disco (mtime diferente) é recarregado. Com mais de max_mazes
+    labirintos, o usado há mais tempo é descartado.
+    """
+
+    def __init__(self, max_mazes: int = 8):
+        if max_mazes < 1:
+            raise ValueError("max_mazes deve ser pelo menos 1")
+        self.max_mazes = max_mazes
+        self._mazes: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'loads': 0, 'evictions': 0}
+
+    def get(self, path: str) -> Maze:
+        key = os.path.realpath(path)
+        mtime = os.stat(key).st_mtime_ns
+        with self._lock:
+            entry = self._mazes.get(key)
+            if entry is not None and entry[0] == mtime:
+                self._mazes.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+        maze = Maze.from_file(key)
+        with self._lock:
+            self._mazes[key] = (mtime, maze)
+            self._mazes.move_to_end(key)
+            self.stats['loads'] += 1
+            while len(self._mazes) > self.max_mazes:
+                self._mazes.popitem(last=False)
+                self.stats['evictions'] += 1
+        return maze
+
+    def __len__(self) -> int:
+        return len(self._mazes)
+
+
+# ----------------------------------------------------------------------
+# Processos do pool: cada um tem o seu cache de labirintos
+# ----------------------------------------------------------------------
+_worker_cache: Optional[MazeCache] = None
+
+def _init_worker(max_mazes: int):
+    global _worker_cache
+    _worker_cache = MazeCache(max_mazes)
+
+def _json_metrics(metrics: Dict) -> Dict:
+    # só o que cabe em JSON (distance_field e afins ficam de fora)
+    out = {}
+    for k, v in metrics.items():
+        if isinstance(v, (bool, int, float, str)) or v is None:
+            out[k] = v
+        elif isinstance(v, (np.integer, np.floating)):
+            out[k] = v.item()
+    return out
+
+def _solve(maze_path: str, algorithm: str, start, goal, return_path: bool) -> Dict:
+    maze = _worker_cache.get(maze_path).with_endpoints(tuple(start), tuple(goal))
+    res = _ALGORITHMS_BY_NAME[algorithm](maze)
+    return {
+        "found": res.found,
+        "cost": res.cost if res.found else None,
+        "path": [list(p) for p in res.path] if return_path else None,
+        "path_length": len(res.path),
+        "search_time_s": res.time,
+        "metrics": _json_metrics(res.metrics),
+    }
+
+
+class PathService:
+    """
+    Serviço assíncrono de consultas de caminho, em linhas JSON (uma
+    requisição por linha, uma resposta por linha, casadas pelo campo "id";
+    numa mesma conexão as respostas podem sair fora de ordem).
+
+    Operações:
+      {"op": "search", "maze": arquivo, "start": [r, c], "goal": [r, c],
+       "algorithm": "A*-Manhattan", "timeout": s, "return_path": true}
+      {"op": "stats"}   fila, latências (p50/p90/p99) e contadores
+      {"op": "ping"}
+
+    Este processo guarda os labirintos (MazeCache) com o índice de
+    componentes, valida as posições e responde na hora as consultas sem
+    solução; as buscas vão para um pool de processos, cada um com seu próprio
+    cache. Uma busca que passa do timeout recebe erro "timeout", mas o
+    processo do pool só fica livre quando ela termina.
+    """
+
+    def __init__(self, workers: Optional[int] = None, max_mazes: int = 8,
+                 default_timeout: float = 30.0, latency_window: int = 10_000):
+        self.cache = MazeCache(max_mazes)
+        self.default_timeout = default_timeout
+        self.pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(max_mazes,))
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=latency_window)
+        self.counters = {'requests': 0, 'searches': 0, 'errors': 0, 'timeouts': 0, 'unreachable': 0}
+        self.started = time.time()
+        self._clients: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    def _load(self, path: str) -> Maze:
+        maze = self.cache.get(path)
+        component_index(maze)
+        return maze
+
+    async def search(self, req: Dict) -> Dict:
+        algorithm = req.get("algorithm", DEFAULT_ALGORITHM)
+        if algorithm not in _ALGORITHMS_BY_NAME:
+            raise ValueError(f"Algoritmo desconhecido: {algorithm}")
+        path, start, goal = str(req["maze"]), tuple(req["start"]), tuple(req["goal"])
+        loop = asyncio.get_running_loop()
+        maze = await loop.run_in_executor(None, self._load, path)
+        view = maze.with_endpoints(start, goal)  # valida as posições
+        if not component_index(maze).connected(view.start_id, view.goal_id):
+            self.counters['unreachable'] += 1
+            return {"found": False, "cost": None, "path": None, "path_length": 0,
+                    "search_time_s": 0.0, "metrics": {"unreachable": True}}
+
+        timeout = float(req.get("timeout", self.default_timeout))
+        self.queue_depth += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+        try:
+            fut = loop.run_in_executor(self.pool, _solve, path, algorithm, start, goal,
+                                       bool(req.get("return_path", True)))
+            return await asyncio.wait_for(fut, timeout)
+        finally:
+            self.queue_depth -= 1
+
+    def stats(self) -> Dict:
+        lat = np.array(self.latencies) * 1000.0
+        pct = ({f"p{q}": float(np.percentile(lat, q)) for q in (50, 90, 99)} if lat.size else {})
+        return {
+            "uptime_s": time.time() - self.started,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "latency_ms": dict(pct, max=float(lat.max()) if lat.size else None, samples=int(lat.size)),
+            "counters": dict(self.counters),
+            "maze_cache": dict(self.cache.stats, size=len(self.cache)),
+        }
+
+    async def handle(self, req: Dict) -> Dict:
+        self.counters['requests'] += 1
+        op = req.get("op", "search")
+        t0 = time.perf_counter()
+        try:
+            if op == "ping":
+                return {"ok": True}
+            if op == "stats":
+                return {"ok": True, "stats": self.stats()}
+            if op != "search":
+                raise ValueError(f"Operação desconhecida: {op}")
+            self.counters['searches'] += 1
+            out = await self.search(req)
+            out["ok"] = True
+            return out
+        except asyncio.TimeoutError:
+            self.counters['timeouts'] += 1
+            return {"ok": False, "error": "timeout"}
+        except Exception as e:  # toda requisição recebe resposta, até as que quebram o pool
+            self.counters['errors'] += 1
+            return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        finally:
+            if op == "search":
+                self.latencies.append(time.perf_counter() - t0)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        lock = asyncio.Lock()
+        tasks = set()
+        me = asyncio.current_task()
+        self._clients[me] = writer
+
+        async def answer(line: bytes):
+            try:
+                req = json.loads(line)
+                if not isinstance(req, dict):
+                    raise ValueError("a requisição deve ser um objeto JSON")
+            except ValueError as e:
+                self.counters['errors'] += 1
+                resp = {"ok": False, "error": f"JSON inválido: {e}"}
+            else:
+                resp = await self.handle(req)
+                if "id" in req:
+                    resp["id"] = req["id"]
+            async with lock:
+                writer.write(json.dumps(resp).encode() + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.create_task(answer(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            del self._clients[me]
+            writer.close()
+
+    async def start(self, socket_path: Optional[str] = None, host: str = "127.0.0.1",
+                    port: int = 8765) -> asyncio.AbstractServer:
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+            return await asyncio.start_unix_server(self.handle_client, path=socket_path, limit=LINE_LIMIT)
+        return await asyncio.start_server(self.handle_client, host, port, limit=LINE_LIMIT)
+
+    async def shutdown(self, server: asyncio.AbstractServer):
+        """Para de aceitar conexões, fecha as abertas e encerra o pool."""
+        server.close()
+        await server.wait_closed()
+        # fechar o transporte entrega EOF ao readline de cada conexão, que
+        # termina normalmente em vez de ser cancelada junto com o loop
+        for writer in list(self._clients.values()):
+            writer.close()
+        if self._clients:
+            await asyncio.wait(list(self._clients))
+        self.close()
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+
+# ----------------------------------------------------------------------
+# Gerador de carga
+# ----------------------------------------------------------------------
+async def _connect(socket_path: Optional[str], host: str, port: int):
+    if socket_path:
+        return await asyncio.open_unix_connection(socket_path, limit=LINE_LIMIT)
+    return await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+
+async def run_load(maze_paths: List[str], n_requests: int, concurrency: int = 8,
+                   algorithms: Optional[List[str]] = None, socket_path: Optional[str] = None,
+                   host: str = "127.0.0.1", port: int = 8765, seed: int = 0,
+                   timeout: Optional[float] = None, return_path: bool = False) -> Dict:
+    """
+    Dispara n_requests consultas com início e objetivo sorteados entre as
+    células livres dos labirintos, por `concurrency` conexões (cada uma com
+    uma requisição por vez). Retorna latências vistas pelo cliente, vazão,
+    contagem de respostas e as estatísticas do servidor ao final.
+    """
+    rng = random.Random(seed)
+    free = {}
+    for p in maze_paths:
+        mz = Maze.from_file(p)
+        free[p] = (mz.W, np.flatnonzero(np.frombuffer(mz.cells, dtype=np.uint8)))
+    algorithms = algorithms or [DEFAULT_ALGORITHM]
+    unknown = [a for a in algorithms if a not in _ALGORITHMS_BY_NAME]
+    if unknown:
+        raise ValueError(f"Algoritmos desconhecidos: {', '.join(unknown)}")
+
+    requests = []
+    for i in range(n_requests):
+        p = rng.choice(maze_paths)
+        W, cells = free[p]
+        s, g = (int(cells[rng.randrange(cells.size)]) for _ in range(2))
+        req = {"id": i, "op": "search", "maze": os.path.realpath(p), "algorithm": rng.choice(algorithms),
+               "start": list(divmod(s, W)), "goal": list(divmod(g, W)), "return_path": return_path}
+        if timeout is not None:
+            req["timeout"] = timeout
+        requests.append(req)
+
+    latencies, outcomes = [], {"found": 0, "not_found": 0, "unreachable": 0, "timeout": 0, "error": 0}
+    queue = deque(requests)
+
+    async def worker():
+        reader, writer = await _connect(socket_path, host, port)
+        try:
+            while queue:
+                req = queue.popleft()
+                t0 = time.perf_counter()
+                writer.write(json.dumps(req).encode() + b"\n")
+                await writer.drain()
+                resp = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - t0)
+                if not resp.get("ok"):
+                    outcomes["timeout" if resp.get("error") == "timeout" else "error"] += 1
+                elif resp["found"]:
+                    outcomes["found"] += 1
+                elif resp["metrics"].get("unreachable"):
+                    outcomes["unreachable"] += 1
+                else:
+                    outcomes["not_found"] += 1
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    wall = time.perf_counter() - t0
+
+    reader, writer = await _connect(socket_path, host, port)
+    writer.write(b'{"op": "stats"}\n')
+    await writer.drain()
+    server_stats = json.loads(await reader.readline())["stats"]
+    writer.close()
+    await writer.wait_closed()
+
+    lat = np.array(latencies) * 1000.0
+    return {
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "wall_s": wall,
+        "throughput_rps": n_requests / wall if wall > 0 else None,
+        "client_latency_ms": {f"p{q}": float(np.percentile(lat, q)) for q in (50, 90, 99)} if lat.size else {},
+        "outcomes": outcomes,
+        "server": server_stats,
+    }
+
+async def _load_with_local_server(args) -> Dict:
+    service = PathService(workers=args.workers, max_mazes=args.max_mazes, default_timeout=args.timeout)
+    server = await service.start(args.socket, args.host, args.port)
+    try:
+        return await run_load(args.mazes, args.requests, args.concurrency, args.algorithms, args.socket,
+                              args.host, args.port, args.seed, args.timeout, args.return_path)
+    finally:
+        await service.shutdown(server)
+
+async def _serve(args):
+    service = PathService(workers=args.workers, max_mazes=args.max_mazes, default_timeout=args.timeout)
+    server = await service.start(args.socket, args.host, args.port)
+    where = args.socket or f"{args.host}:{args.port}"
+    print(f"Serviço de caminhos em {where} ({len(_ALGORITHMS_BY_NAME)} algoritmos)")
+    try:
+        await server.serve_forever()
+    finally:
+        await service.shutdown(server)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serviço assíncrono de consultas de caminho (linhas JSON)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "load"):
+        p = sub.add_parser(name)
+        p.add_argument("--socket", default=None, help="socket Unix (padrão: TCP em --host/--port)")
+        p.add_argument("--host", default="127.0.0.1")
+        p.add_argument("--port", type=int, default=8765)
+        p.add_argument("--workers", type=int, default=None, help="processos do pool (padrão: nº de CPUs)")
+        p.add_argument("--max-mazes", type=int, default=8, help="labirintos mantidos em cache")
+        p.add_argument("--timeout", type=float, default=30.0, help="segundos por busca")
+    load = sub.choices["load"]
+    load.add_argument("mazes", nargs="+", help="arquivos de labirinto usados nas consultas")
+    load.add_argument("--requests", type=int, default=1000)
+    load.add_argument("--concurrency", type=int, default=16)
+    load.add_argument("--algorithms", nargs="*", default=None)
+    load.add_argument("--seed", type=int, default=0)
+    load.add_argument("--return-path", action="store_true")
+    load.add_argument("--spawn-server", action="store_true",
+                      help="sobe o serviço no mesmo processo, só para o teste")
+    args = parser.parse_args()
+
+    try:
+        if args.command == "serve":
+            asyncio.run(_serve(args))
+        else:
+            if args.spawn_server:
+                summary = asyncio.run(_load_with_local_server(args))
+            else:
+                summary = asyncio.run(run_load(args.mazes, args.requests, args.concurrency, args.algorithms,
+                                               args.socket, args.host, args.port, args.seed,
+                                               args.timeout, args.return_path))
+            print(json.dumps(summary, indent=2))
+    except KeyboardInterrupt:
+        sys.exit(130)
@@ -1,157 +1,255 @@
 # src/plot_comparative.py
+import argparse
+import hashlib
+import json
 import pandas as pd
 import matplotlib.pyplot as plt
 import os
 from pathlib import Path
+from typing import List, Optional
 import numpy as np
+from result_sink import iter_results, results_signature
 
-def plot_comparative(csv_path: str, output_dir: str = "../results"):
-   
-    os.makedirs(output_dir, exist_ok=True)
-    df = pd.read_csv(csv_path)
+# -----------------------------
+# Agregação (uma passada pelos resultados, em blocos)
+# -----------------------------
+# Cada grupo (algoritmo, tamanho, densidade) guarda, por métrica, contagem,
+# média e M2 (soma dos quadrados dos desvios). Esses momentos se combinam
+# entre blocos sem reler as linhas, e qualquer agrupamento mais grosso dos
+# gráficos sai deles; o resumo em disco é essa tabela.
+SUMMARY_VERSION = 1
+# fora de results/ (versionado); .cache/ está no .gitignore
+DEFAULT_SUMMARY_DIR = Path(__file__).resolve().parent.parent / ".cache" / "summaries"
+KEYS = ["algorithm", "width", "height", "density"]
+METRICS = ["time_s", "nodes_expanded", "memory_usage", "cost", "peak_alloc_kb", "bytes_per_node"]
+READ_DTYPES = {
+    "maze_size": "category", "maze_density": "category", "algorithm": "category",
+    "cost": "float64", "time_s": "float64", "nodes_expanded": "float64",
+    "max_frontier_size": "float64", "max_explored_size": "float64",
+    "peak_alloc_bytes": "float64", "bytes_per_node": "float64",
+}
 
-    # -----------------------------
-    # 1. Limpeza e tratamento
-    # -----------------------------
-    def parse_size(size_str):
-        try:
-            w, h = size_str.lower().split("x")
-            return int(w), int(h)
-        except Exception:
-            return None, None
+# t de Student bicaudal 95% para 1..30 graus de liberdade; acima disso, normal
+_T95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+
+def _from_categories(values: pd.Series, parse) -> List[np.ndarray]:
+    # interpreta só os valores distintos (poucos) e espalha pelos códigos
+    cat = values.astype("category")
+    codes = cat.cat.codes.to_numpy()
+    parsed = parse(pd.Series(cat.cat.categories.astype(str)))
+    return [np.append(col, np.nan)[codes] for col in parsed]  # código -1 (ausente) cai no NaN do fim
 
-    df["width"], df["height"] = zip(*df["maze_size"].map(parse_size))
-    df["cells"] = df["width"] * df["height"]
 
-    def safe_to_float(x):
-        try:
-            return float(str(x).replace("%", ""))
-        except ValueError:
-            return None
+def _parse_size(sizes: pd.Series):
+    wh = sizes.str.lower().str.extract(r"^\s*(\d+)\s*x\s*(\d+)\s*$").astype("float64")
+    return wh[0].to_numpy(), wh[1].to_numpy()
 
-    df["density"] = df["maze_density"].apply(safe_to_float)
 
-    # Nova métrica de uso de memória (nós mantidos simultaneamente)
-    df["memory_usage"] = df["max_frontier_size"] + df["max_explored_size"]
+def _parse_density(densities: pd.Series):
+    return (pd.to_numeric(densities.str.replace("%", "", regex=False), errors="coerce").to_numpy(),)
 
+
+def _chunk_moments(df: pd.DataFrame) -> pd.DataFrame:
+    df = pd.DataFrame({
+        "algorithm": df["algorithm"].astype(str),
+        **dict(zip(["width", "height"], _from_categories(df["maze_size"], _parse_size))),
+        "density": _from_categories(df["maze_density"], _parse_density)[0],
+        "time_s": df["time_s"],
+        "nodes_expanded": df["nodes_expanded"],
+        "cost": df["cost"],
+        # Nós mantidos simultaneamente (aproximação; a memória real, quando
+        # medida, está em peak_alloc_bytes / peak_rss_delta_bytes)
+        "memory_usage": df["max_frontier_size"] + df["max_explored_size"],
+        "peak_alloc_kb": df["peak_alloc_bytes"] / 1024 if "peak_alloc_bytes" in df else np.nan,
+        "bytes_per_node": df["bytes_per_node"] if "bytes_per_node" in df else np.nan,
+    })
     df = df.dropna(subset=["width", "time_s", "nodes_expanded"])
 
-    algorithms = ["BFS", "DFS", "Greedy-Manhattan", "Greedy-Euclidean", "A*-Manhattan", "A*-Euclidean"]
-    colors = ["#171db6", "#d12222", "#7241a0", "#c5b0d5", "#178a1b", "#22f130"]
+    grouped = df.groupby(KEYS, dropna=False, sort=False)
+    out = {}
+    for m in METRICS:
+        agg = grouped[m].agg(["count", "mean", "var"])
+        out[f"{m}_n"] = agg["count"]
+        out[f"{m}_mean"] = agg["mean"]
+        out[f"{m}_m2"] = agg["var"].fillna(0.0) * (agg["count"] - 1).clip(lower=0)
+    return pd.DataFrame(out).reset_index()
 
-    # -----------------------------
-    # 2. Gráfico – Tempo × Tamanho
-    # -----------------------------
-    grouped_size = (
-        df.groupby(["algorithm", "width"], as_index=False)
-        .agg({"time_s": "mean"})
-        .sort_values(by="width")
-    )
+
+def combine_moments(moments: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    Junta os momentos das linhas com as mesmas chaves (fórmula de Chan:
+    M2 = soma dos M2 + soma de n_i * (média_i - média)^2), sem a perda de
+    precisão de acumular somas de quadrados.
+    """
+    out = moments[keys].copy()
+    group = out.groupby(keys, dropna=False, sort=False).ngroup().to_numpy()
+    for m in METRICS:
+        n = moments[f"{m}_n"].fillna(0).to_numpy(dtype="float64")
+        mean = moments[f"{m}_mean"].fillna(0.0).to_numpy()
+        total = np.bincount(group, weights=n)
+        center = np.bincount(group, weights=n * mean) / np.where(total > 0, total, 1.0)
+        out[f"{m}_n"] = n
+        out[f"{m}_s"] = n * mean
+        out[f"{m}_m2"] = moments[f"{m}_m2"].fillna(0.0).to_numpy() + n * (mean - center[group]) ** 2
+
+    sums = out.groupby(keys, dropna=False, sort=True).sum()
+    result = pd.DataFrame(index=sums.index)
+    for m in METRICS:
+        n = sums[f"{m}_n"]
+        result[f"{m}_n"] = n.astype("int64")
+        result[f"{m}_mean"] = sums[f"{m}_s"] / n.where(n > 0)
+        result[f"{m}_m2"] = sums[f"{m}_m2"]
+    return result.reset_index()
+
+
+def describe(moments: pd.DataFrame, metric: str) -> pd.DataFrame:
+    """Média, desvio padrão (amostral) e meia largura do IC de 95% da média."""
+    n = moments[f"{metric}_n"]
+    std = np.sqrt(moments[f"{metric}_m2"] / (n - 1).where(n > 1))
+    t = np.where(n > 31, 1.96, np.array(_T95 + [1.96])[np.clip(n - 2, 0, 30)])
+    return pd.DataFrame({
+        "mean": moments[f"{metric}_mean"],
+        "std": std,
+        "ci95": t * std / np.sqrt(n),
+    }, index=moments.index)
+
+
+def aggregate_results(results_path: str, summary_path: Optional[str] = None,
+                      chunksize: int = 500_000, refresh: bool = False) -> pd.DataFrame:
+    """
+    Momentos de cada (algoritmo, largura, altura, densidade), lidos do resumo
+    em cache quando ele corresponde à saída atual (mesmos arquivos, tamanhos
+    e mtimes); senão relê os resultados em blocos e regrava o resumo. Sem
+    summary_path, o resumo fica em DEFAULT_SUMMARY_DIR, com o nome da saída
+    (sufixo incluído) e um hash do caminho dela.
+    """
+    results_path = Path(results_path)
+    if summary_path is None:
+        digest = hashlib.sha1(str(results_path.resolve()).encode()).hexdigest()[:10]
+        summary_path = DEFAULT_SUMMARY_DIR / f"{results_path.name}-{digest}.summary.csv"
+    summary_path = Path(summary_path)
+    meta_path = summary_path.with_suffix(".json")
+    signature = {"version": SUMMARY_VERSION, "source": results_path.name,
+                 "files": results_signature(results_path)}
+
+    if not refresh and summary_path.exists() and meta_path.exists():
+        if json.loads(meta_path.read_text(encoding="utf-8")) == signature:
+            print(f" Resumo em cache: {summary_path}")
+            return pd.read_csv(summary_path, dtype={"algorithm": str})
+
+    acc = None
+    rows = 0
+    for chunk in iter_results(results_path, columns=list(READ_DTYPES), chunksize=chunksize, dtype=READ_DTYPES):
+        rows += len(chunk)
+        part = _chunk_moments(chunk)
+        acc = part if acc is None else combine_moments(pd.concat([acc, part], ignore_index=True), KEYS)
+    if acc is None:
+        acc = combine_moments(_chunk_moments(pd.DataFrame(columns=list(READ_DTYPES))), KEYS)
+    else:
+        acc = combine_moments(acc, KEYS)  # ordena e normaliza os tipos mesmo com um bloco só
+
+    summary_path.parent.mkdir(parents=True, exist_ok=True)
+    acc.to_csv(summary_path, index=False, encoding="utf-8")
+    meta_path.write_text(json.dumps(signature), encoding="utf-8")
+    print(f" {rows} linhas agregadas em {len(acc)} grupos: {summary_path}")
+    return acc
+
+
+# -----------------------------
+# Gráficos (a partir do resumo)
+# -----------------------------
+ALGORITHMS = ["BFS", "DFS", "Greedy-Manhattan", "Greedy-Euclidean", "A*-Manhattan", "A*-Euclidean",
+              "BiBFS", "BiA*-Manhattan", "BiA*-Euclidean", "Greedy-Landmarks", "A*-Landmarks"]
+COLORS = ["#171db6", "#d12222", "#7241a0", "#c5b0d5", "#178a1b", "#22f130",
+          "#17becf", "#ff7f0e", "#ffbb78", "#8c564b", "#e377c2"]
+
+
+def _line_chart(moments: pd.DataFrame, x: str, metric: str, title: str, xlabel: str, ylabel: str,
+                path: str, log_ylabel: Optional[str] = None):
+    # média por algoritmo ao longo de x, com a faixa do IC de 95%
+    grouped = combine_moments(moments, ["algorithm", x])
+    stats = describe(grouped, metric)
+    grouped = grouped.assign(mean=stats["mean"], ci95=stats["ci95"].fillna(0.0)).dropna(subset=["mean"])
 
     plt.figure(figsize=(8, 5))
-    for algo, color in zip(algorithms, colors):
-        subset = grouped_size[grouped_size["algorithm"] == algo]
-        plt.plot(subset["width"], subset["time_s"], marker="^", linewidth=2, markersize=6, color=color, label=algo)
-    plt.title("Tempo médio por tamanho do labirinto", fontsize=13, weight="bold")
-    plt.xlabel("Tamanho (largura)", fontsize=11)
-    plt.ylabel("Tempo médio (s)", fontsize=11)
-    if grouped_size["time_s"].max() / grouped_size["time_s"].min() > 50:
+    for algo, color in zip(ALGORITHMS, COLORS):
+        subset = grouped[grouped["algorithm"] == algo].sort_values(by=x)
+        plt.plot(subset[x], subset["mean"], marker="^", linewidth=2, markersize=6, color=color, label=algo)
+        plt.fill_between(subset[x], subset["mean"] - subset["ci95"], subset["mean"] + subset["ci95"],
+                         color=color, alpha=0.15, linewidth=0)
+    plt.title(title, fontsize=13, weight="bold")
+    plt.xlabel(xlabel, fontsize=11)
+    plt.ylabel(ylabel, fontsize=11)
+    if log_ylabel and grouped["mean"].min() > 0 and grouped["mean"].max() / grouped["mean"].min() > 50:
         plt.yscale("log")
-        plt.ylabel("Tempo médio (s) [escala log]", fontsize=11)
+        plt.ylabel(log_ylabel, fontsize=11)
     plt.legend(title="Algoritmo", fontsize=9)
     plt.grid(True, linestyle="--", alpha=0.4)
     plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "comparativo_tempo_tamanho.png"), dpi=300)
+    plt.savefig(path, dpi=300)
     plt.close()
 
-    # -----------------------------
-    # 3. Gráfico – Nós Expandidos × Tamanho
-    # -----------------------------
-    grouped_nodes = (
-        df.groupby(["algorithm", "width"], as_index=False)
-        .agg({"nodes_expanded": "mean"})
-        .sort_values(by="width")
-    )
 
-    plt.figure(figsize=(8, 5))
-    for algo, color in zip(algorithms, colors):
-        subset = grouped_nodes[grouped_nodes["algorithm"] == algo]
-        plt.plot(subset["width"], subset["nodes_expanded"], marker="^", linewidth=2, markersize=6, color=color, label=algo)
-    plt.title("Nós expandidos por tamanho de labirinto", fontsize=13, weight="bold")
-    plt.xlabel("Tamanho do labirinto", fontsize=11)
-    plt.ylabel("Nós expandidos (média)", fontsize=11)
-    plt.legend(title="Algoritmo", fontsize=9)
-    plt.grid(True, linestyle="--", alpha=0.4)
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "comparativo_nos_tamanho.png"), dpi=300)
-    plt.close()
+def plot_comparative(csv_path: str, output_dir: str = "../results", summary_path: Optional[str] = None,
+                     chunksize: int = 500_000, refresh: bool = False):
 
-    # -----------------------------
-    # 4. Gráfico – Memória × Tamanho
-    # -----------------------------
-    grouped_memory = (
-        df.groupby(["algorithm", "width"], as_index=False)
-        .agg({"memory_usage": "mean"})
-        .sort_values(by="width")
-    )
+    os.makedirs(output_dir, exist_ok=True)
+    moments = aggregate_results(csv_path, summary_path, chunksize=chunksize, refresh=refresh)
+    has_real_memory = moments["peak_alloc_kb_n"].sum() > 0
+    out = lambda name: os.path.join(output_dir, name)
 
-    plt.figure(figsize=(8, 5))
-    for algo, color in zip(algorithms, colors):
-        subset = grouped_memory[grouped_memory["algorithm"] == algo]
-        plt.plot(subset["width"], subset["memory_usage"], marker="^", linewidth=2, markersize=6, color=color, label=algo)
-    plt.title("Uso de memória por tamanho do labirinto", fontsize=13, weight="bold")
-    plt.xlabel("Tamanho do labirinto", fontsize=11)
-    plt.ylabel("Nós armazenados simultaneamente (média)", fontsize=11)
-    plt.legend(title="Algoritmo", fontsize=9)
-    plt.grid(True, linestyle="--", alpha=0.4)
-    plt.tight_layout()
-    plt.savefig(os.path.join(output_dir, "comparativo_memoria_tamanho.png"), dpi=300)
-    plt.close()
+    # Tempo, nós expandidos e memória × tamanho
+    _line_chart(moments, "width", "time_s", "Tempo médio por tamanho do labirinto",
+                "Tamanho (largura)", "Tempo médio (s)", out("comparativo_tempo_tamanho.png"),
+                log_ylabel="Tempo médio (s) [escala log]")
+    _line_chart(moments, "width", "nodes_expanded", "Nós expandidos por tamanho de labirinto",
+                "Tamanho do labirinto", "Nós expandidos (média)", out("comparativo_nos_tamanho.png"))
+    _line_chart(moments, "width", "memory_usage", "Nós armazenados por tamanho do labirinto",
+                "Tamanho do labirinto", "Nós armazenados simultaneamente (média)",
+                out("comparativo_memoria_tamanho.png"))
 
-    # -----------------------------
-    # 5. Gráfico – Tempo × Densidade (opcional)
-    # -----------------------------
-    valid_density = df.dropna(subset=["density"])
+    # Memória real × tamanho e bytes por nó (se medidos)
+    if has_real_memory:
+        _line_chart(moments, "width", "peak_alloc_kb", "Memória real por tamanho do labirinto",
+                    "Tamanho do labirinto", "Pico de alocação (KB, média)",
+                    out("comparativo_memoria_real_tamanho.png"))
+        _line_chart(moments, "width", "bytes_per_node", "Bytes por nó por tamanho do labirinto",
+                    "Tamanho do labirinto", "Bytes por nó armazenado (média)", out("comparativo_bytes_por_no.png"))
+
+    # Tempo × densidade (opcional)
+    valid_density = moments.dropna(subset=["density"])
     if not valid_density.empty:
-        grouped_density = (
-            valid_density.groupby(["algorithm", "density"], as_index=False)
-            .agg({"time_s": "mean"})
-            .sort_values(by="density")
-        )
-
-        plt.figure(figsize=(8, 5))
-        for algo, color in zip(algorithms, colors):
-            subset = grouped_density[grouped_density["algorithm"] == algo]
-            plt.plot(subset["density"], subset["time_s"], marker="^", linewidth=2, markersize=6, color=color, label=algo)
-        plt.title("Tempo médio por densidade de labirinto", fontsize=13, weight="bold")
-        plt.xlabel("Densidade de paredes (%)", fontsize=11)
-        plt.ylabel("Tempo médio (s)", fontsize=11)
-        plt.legend(title="Algoritmo", fontsize=9)
-        plt.grid(True, linestyle="--", alpha=0.4)
-        plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, "comparativo_tempo_densidade.png"), dpi=300)
-        plt.close()
+        _line_chart(valid_density, "density", "time_s", "Tempo médio por densidade de labirinto",
+                    "Densidade de paredes (%)", "Tempo médio (s)", out("comparativo_tempo_densidade.png"))
         print("Gráfico de densidade gerado com sucesso.")
     else:
         print("Nenhuma densidade válida encontrada; gráfico de densidade não gerado.")
 
     # -----------------------------
-    # 6. Resumo estatístico
+    # Resumo estatístico por algoritmo
     # -----------------------------
-    stats = (
-        df.groupby("algorithm")
-        .agg(
-            tempo_medio=("time_s", "mean"),
-            tempo_desvio=("time_s", "std"),
-            nos_medios=("nodes_expanded", "mean"),
-            nos_desvio=("nodes_expanded", "std"),
-            memoria_media=("memory_usage", "mean"),
-            memoria_desvio=("memory_usage", "std"),
-            custo_medio=("cost", "mean"),
-        )
-        .round(4)
-        .reset_index()
-    )
+    by_algo = combine_moments(moments, ["algorithm"])
+    time_s, nodes = describe(by_algo, "time_s"), describe(by_algo, "nodes_expanded")
+    memory = describe(by_algo, "memory_usage")
+    stats = pd.DataFrame({
+        "algorithm": by_algo["algorithm"],
+        "tempo_medio": time_s["mean"],
+        "tempo_desvio": time_s["std"],
+        "tempo_ic95": time_s["ci95"],
+        "nos_medios": nodes["mean"],
+        "nos_desvio": nodes["std"],
+        "nos_ic95": nodes["ci95"],
+        "memoria_media": memory["mean"],
+        "memoria_desvio": memory["std"],
+        "custo_medio": describe(by_algo, "cost")["mean"],
+    })
+    if has_real_memory:
+        stats["memoria_real_media_kb"] = describe(by_algo, "peak_alloc_kb")["mean"]
+        stats["bytes_por_no_medio"] = describe(by_algo, "bytes_per_node")["mean"]
+    stats = stats.round(4)
 
     # Salva o resumo
     stats_path = os.path.join(output_dir, "summary_statistics.csv")
@@ -163,5 +261,13 @@ def plot_comparative(csv_path: str, output_dir: str = "../results"):
 
 if __name__ == "__main__":
     HERE = Path(__file__).parent
-    csv_path = os.path.join(HERE.parent, "results", "results_all.csv")
-    plot_comparative(csv_path)
+    parser = argparse.ArgumentParser(description="Gráficos comparativos a partir dos resultados")
+    parser.add_argument("--input", default=os.path.join(HERE.parent, "results", "results_all.csv"),
+                        help="resultados (.csv, ou pasta .parquet/.arrow)")
+    parser.add_argument("--output-dir", default=os.path.join(HERE.parent, "results"))
+    parser.add_argument("--summary", default=None,
+                        help="resumo agregado em cache (padrão: .cache/summaries/<entrada>-<hash>.summary.csv)")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="linhas lidas por bloco")
+    parser.add_argument("--refresh", action="store_true", help="reagrega mesmo com o resumo em dia")
+    args = parser.parse_args()
+    plot_comparative(args.input, args.output_dir, args.summary, chunksize=args.chunksize, refresh=args.refresh)
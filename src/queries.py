@@ -0,0 +1,201 @@
+# src/queries.py
+from typing import Tuple, List, Optional, Callable, Iterable
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+import time
+
+import numpy as np
+
+from components import component_index
+from heuristics import h_manhattan
+from search import SearchResult, a_star_search, _wavefront, _descend_gradient, _common_metrics_init, _unreachable
+
+Pos = Tuple[int, int]
+Query = Tuple[Pos, Pos]
+
+# Labirinto e heurística de cada processo do pool (definidos no initializer)
+_worker_maze = None
+_worker_heuristic = None
+
+def _init_worker(maze, heuristic):
+    global _worker_maze, _worker_heuristic
+    _worker_maze = maze
+    _worker_heuristic = heuristic
+
+def _solve_single(query: Query) -> SearchResult:
+    start, goal = query
+    return a_star_search(_worker_maze.with_endpoints(start, goal), _worker_heuristic)
+
+
+class PathQueryEngine:
+    """
+    Responde lotes de consultas (início, objetivo) sobre um mesmo labirinto.
+
+    Consultas que compartilham início ou objetivo são agrupadas e respondidas
+    por um único campo de distâncias (árvore de busca completa a partir do
+    ponto comum; como o grid é não direcionado, serve para os dois sentidos).
+    Antes disso, o índice de componentes descarta em lote as consultas sem
+    solução, que saem sem busca nenhuma.
+    Os campos ficam num cache LRU limitado por memory_budget (bytes). As
+    consultas isoladas rodam A* e, com workers > 1, são distribuídas num pool
+    de processos.
+
+    O motor se registra em maze.derived: depois de `Maze.set_cells`,
+    cells_changed esvazia o cache de campos e encerra o pool, que é refeito
+    com o labirinto atualizado na próxima consulta.
+    """
+
+    def __init__(self, maze, heuristic: Callable[[Pos, Pos], float] = h_manhattan,
+                 memory_budget: int = 256 * 2**20, min_group_size: int = 2,
+                 workers: Optional[int] = None):
+        self.maze = maze
+        self.heuristic = heuristic
+        self.memory_budget = memory_budget
+        self.min_group_size = min_group_size
+        self.workers = workers
+        self._trees: "OrderedDict[int, Tuple]" = OrderedDict()
+        self._tree_bytes = 0
+        self._pool = None
+        self.stats = {'trees_built': 0, 'tree_hits': 0, 'tree_evictions': 0,
+                      'tree_answers': 0, 'single_searches': 0, 'unreachable': 0}
+        self._key = ('queries', id(self))
+        maze.derived[self._key] = self
+
+    def cells_changed(self, maze, ids) -> bool:
+        # campos e cópia do labirinto nos processos ficaram velhos
+        self.clear_cache()
+        self.close()
+        return True
+
+    # ------------------------------------------------------------------
+    # Cache de árvores (campos de distância por célula de origem)
+    # ------------------------------------------------------------------
+    def _tree(self, source: int):
+        entry = self._trees.get(source)
+        if entry is not None:
+            self._trees.move_to_end(source)
+            self.stats['tree_hits'] += 1
+            return entry
+        t0 = time.perf_counter()
+        dist, metrics = _wavefront(self.maze, [source])
+        entry = (dist, metrics, time.perf_counter() - t0)
+        self.stats['trees_built'] += 1
+        if dist.nbytes <= self.memory_budget:
+            self._trees[source] = entry
+            self._tree_bytes += dist.nbytes
+            while self._tree_bytes > self.memory_budget:
+                _, (old, _, _) = self._trees.popitem(last=False)
+                self._tree_bytes -= old.nbytes
+                self.stats['tree_evictions'] += 1
+        return entry
+
+    def _answer_from_tree(self, source: int, target: int, share: int, reverse: bool) -> SearchResult:
+        t0 = time.perf_counter()
+        dist, tree_metrics, build_time = self._tree(source)
+        metrics = _common_metrics_init()
+        metrics.update(tree_metrics)
+        metrics['shared_by'] = share
+        self.stats['tree_answers'] += 1
+        if dist[target] < 0:
+            elapsed = time.perf_counter() - t0 + build_time / share
+            return SearchResult(False, [], float('inf'), elapsed, metrics)
+        path = _descend_gradient(self.maze, dist, target)
+        if reverse:
+            path.reverse()
+        elapsed = time.perf_counter() - t0 + build_time / share
+        return SearchResult(True, path, float(len(path) - 1), elapsed, metrics)
+
+    # ------------------------------------------------------------------
+    # Agrupamento
+    # ------------------------------------------------------------------
+    def _group(self, ids: List[Tuple[int, int]]):
+        by_start, by_goal = defaultdict(list), defaultdict(list)
+        for i, (s, g) in enumerate(ids):
+            by_start[s].append(i)
+            by_goal[g].append(i)
+
+        # pontos com mais consultas primeiro; árvores já em cache valem sempre
+        candidates = [(len(v), s, 'start') for s, v in by_start.items()]
+        candidates += [(len(v), g, 'goal') for g, v in by_goal.items()]
+        candidates.sort(key=lambda c: (c[1] not in self._trees, -c[0]))
+
+        assigned = [False] * len(ids)
+        groups = []
+        for _, cell, kind in candidates:
+            members = [i for i in (by_start if kind == 'start' else by_goal)[cell] if not assigned[i]]
+            if not members:
+                continue
+            if len(members) < self.min_group_size and cell not in self._trees:
+                continue
+            for i in members:
+                assigned[i] = True
+            groups.append((cell, kind, members))
+        singles = [i for i in range(len(ids)) if not assigned[i]]
+        return groups, singles
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def query(self, start: Pos, goal: Pos) -> SearchResult:
+        return self.solve([(start, goal)])[0]
+
+    def solve(self, queries: Iterable[Query]) -> List[SearchResult]:
+        queries = [(tuple(s), tuple(g)) for s, g in queries]
+        for s, g in queries:
+            self.maze.with_endpoints(s, g)  # valida as posições
+        ids = [(self.maze.cell_id(s), self.maze.cell_id(g)) for s, g in queries]
+        results: List[Optional[SearchResult]] = [None] * len(queries)
+
+        t0 = time.perf_counter()
+        reachable = component_index(self.maze).connected_many([s for s, _ in ids], [g for _, g in ids])
+        live = [int(i) for i in np.flatnonzero(reachable)]
+        if len(live) < len(ids):
+            for i in np.flatnonzero(~reachable):
+                results[i] = _unreachable(_common_metrics_init(), t0)
+            self.stats['unreachable'] += len(ids) - len(live)
+        groups, singles = self._group([ids[i] for i in live])
+        groups = [(cell, kind, [live[j] for j in members]) for cell, kind, members in groups]
+        singles = [live[j] for j in singles]
+
+        for cell, kind, members in groups:
+            for i in members:
+                s, g = ids[i]
+                if kind == 'start':
+                    # campo a partir do início: desce do objetivo até ele
+                    results[i] = self._answer_from_tree(cell, g, len(members), reverse=False)
+                else:
+                    results[i] = self._answer_from_tree(cell, s, len(members), reverse=True)
+
+        self.stats['single_searches'] += len(singles)
+        if self.workers and self.workers > 1 and len(singles) > 1:
+            pool = self._get_pool()
+            chunk = max(1, len(singles) // (4 * self.workers))
+            for i, res in zip(singles, pool.map(_solve_single, [queries[i] for i in singles], chunksize=chunk)):
+                results[i] = res
+        else:
+            for i in singles:
+                s, g = queries[i]
+                results[i] = a_star_search(self.maze.with_endpoints(s, g), self.heuristic)
+        return results
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers, initializer=_init_worker,
+                                             initargs=(self.maze, self.heuristic))
+        return self._pool
+
+    def clear_cache(self):
+        self._trees.clear()
+        self._tree_bytes = 0
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        self.maze.derived.pop(self._key, None)
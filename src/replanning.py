@@ -0,0 +1,178 @@
+# src/replanning.py
+from typing import Tuple, List, Callable, Iterable
+from array import array
+import heapq
+import time
+
+from heuristics import h_manhattan
+from search import SearchResult, _common_metrics_init
+
+Pos = Tuple[int, int]
+INF = float('inf')
+
+
+class DStarLite:
+    """
+    Replanejamento incremental (D* Lite, busca reversa a partir do objetivo).
+
+    Os valores g/rhs e a fila de prioridade sobrevivem entre as chamadas:
+    depois de `update_cells` (paredes adicionadas/removidas) ou `move_start`
+    (o agente andou), `plan` só repara a parte do espaço de busca afetada.
+    Com o início fixo o comportamento é o do LPA*.
+    A heurística precisa ser consistente (Manhattan/Euclidiana no grid).
+    """
+
+    def __init__(self, maze, heuristic: Callable[[Pos, Pos], float] = h_manhattan):
+        self.maze = maze
+        self.heuristic = heuristic
+        N = maze.N
+        self.g = array('d', [INF]) * N
+        self.rhs = array('d', [INF]) * N
+        # chave atual de cada célula na fila (entradas diferentes são obsoletas)
+        self.key1 = array('d', [INF]) * N
+        self.key2 = array('d', [INF]) * N
+        self.in_open = bytearray(N)
+        self.open_heap = []
+        self.open_size = 0
+        self.km = 0.0
+        self.start = maze.start_id
+        self.last_start = maze.start_id
+        self.goal = maze.goal_id
+        self._counters = None
+
+        self.rhs[self.goal] = 0.0
+        self._insert(self.goal, self._h(self.goal), 0.0)
+
+    def _h(self, cell: int) -> float:
+        W = self.maze.W
+        return self.heuristic(divmod(self.start, W), divmod(cell, W))
+
+    def _key(self, cell: int):
+        m = min(self.g[cell], self.rhs[cell])
+        return (m + self._h(cell) + self.km, m)
+
+    def _insert(self, cell: int, k1: float, k2: float):
+        if not self.in_open[cell]:
+            self.in_open[cell] = 1
+            self.open_size += 1
+        self.key1[cell], self.key2[cell] = k1, k2
+        heapq.heappush(self.open_heap, (k1, k2, cell))
+
+    def _remove(self, cell: int):
+        if self.in_open[cell]:
+            self.in_open[cell] = 0
+            self.open_size -= 1
+
+    def _top(self):
+        heap = self.open_heap
+        while heap:
+            k1, k2, cell = heap[0]
+            if self.in_open[cell] and self.key1[cell] == k1 and self.key2[cell] == k2:
+                return heap[0]
+            heapq.heappop(heap)
+        return (INF, INF, -1)
+
+    def _update_vertex(self, cell: int):
+        maze, g, rhs = self.maze, self.g, self.rhs
+        self._counters['vertex_updates'] += 1
+        if cell != self.goal:
+            best = INF
+            if maze.cells[cell]:
+                for d in maze.moves[maze.nbr_mask[cell]]:
+                    v = g[cell + d] + 1.0
+                    if v < best:
+                        best = v
+            rhs[cell] = best
+        if g[cell] != rhs[cell]:
+            k1, k2 = self._key(cell)
+            self._insert(cell, k1, k2)
+        else:
+            self._remove(cell)
+
+    def _compute_shortest_path(self):
+        maze, g, rhs = self.maze, self.g, self.rhs
+        moves, mask = maze.moves, maze.nbr_mask
+        counters = self._counters
+        s = self.start
+        while True:
+            k1, k2, u = self._top()
+            ks = self._key(s)
+            if not ((k1, k2) < ks or rhs[s] != g[s]):
+                break
+            heapq.heappop(self.open_heap)
+            counters['nodes_expanded'] += 1
+            k_new = self._key(u)
+            if (k1, k2) < k_new:
+                self._insert(u, *k_new)
+            elif g[u] > rhs[u]:
+                g[u] = rhs[u]
+                self._remove(u)
+                for d in moves[mask[u]]:
+                    self._update_vertex(u + d)
+            else:
+                g[u] = INF
+                for d in moves[mask[u]]:
+                    self._update_vertex(u + d)
+                self._update_vertex(u)
+            if self.open_size > counters['max_frontier_size']:
+                counters['max_frontier_size'] = self.open_size
+
+    def _path(self) -> List[Pos]:
+        maze, g = self.maze, self.g
+        W = maze.W
+        cell = self.start
+        path = [divmod(cell, W)]
+        while cell != self.goal:
+            cell = min((cell + d for d in maze.moves[maze.nbr_mask[cell]]), key=g.__getitem__)
+            path.append(divmod(cell, W))
+        return path
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+    def plan(self) -> SearchResult:
+        start_time = time.perf_counter()
+        metrics = _common_metrics_init()
+        metrics['vertex_updates'] = 0
+        metrics['max_frontier_size'] = self.open_size
+        self._counters = metrics
+        self._compute_shortest_path()
+        metrics['nodes_generated'] = metrics['vertex_updates']
+        metrics['max_explored_size'] = metrics['nodes_expanded']
+
+        cost = self.g[self.start]
+        if cost == INF:
+            elapsed = time.perf_counter() - start_time
+            return SearchResult(False, [], float('inf'), elapsed, metrics)
+        path = self._path()
+        elapsed = time.perf_counter() - start_time
+        return SearchResult(True, path, cost, elapsed, metrics)
+
+    def update_cells(self, changes: Iterable[Tuple[Pos, bool]]) -> SearchResult:
+        """Aplica (posição, parede?) no labirinto e replaneja."""
+        changed = self.maze.set_cells(changes)
+        self._counters = {'vertex_updates': 0}
+        moves, mask = self.maze.moves, self.maze.nbr_mask
+        for x in changed:
+            self._update_vertex(x)
+            for d in moves[mask[x]]:
+                self._update_vertex(x + d)
+        pending = self._counters['vertex_updates']
+        result = self.plan()
+        result.metrics['vertex_updates'] += pending
+        result.metrics['cells_changed'] = len(changed)
+        return result
+
+    def move_start(self, p: Pos) -> SearchResult:
+        """
+        O agente andou para p: ajusta km e replaneja a partir dali. O
+        labirinto passa a ser uma visão com início em p (`with_endpoints`),
+        então `update_cells` recusa murar a célula onde o agente está.
+        """
+        maze = self.maze.with_endpoints(p, self.maze.goal)  # ValueError se p for parede
+        cell = maze.start_id
+        W = maze.W
+        self.km += self.heuristic(divmod(self.last_start, W), divmod(cell, W))
+        self.maze = maze
+        self.start = self.last_start = cell
+        return self.plan()
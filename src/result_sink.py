@@ -0,0 +1,235 @@
+# src/result_sink.py
+import csv
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+
+# Identifica uma execução já concluída (o checkpoint é o próprio arquivo de saída)
+JobKey = Tuple[str, str, int]
+
+COLUMNAR_FORMATS = {".parquet": "parquet", ".arrow": "arrow"}
+
+
+def _row_key(row) -> JobKey:
+    return (str(row["maze_file"]), str(row["algorithm"]), int(row["repeat"]))
+
+
+class CsvSink:
+    """
+    Grava linhas num CSV à medida que chegam (append + flush a cada lote).
+    Ao retomar, uma última linha incompleta (queda no meio da escrita) é
+    descartada e as linhas existentes viram o checkpoint.
+
+    Um CSV sem a coluna "repeat" (formato antigo) não serve de checkpoint:
+    é movido para <nome>.legacy.csv e a saída recomeça do zero. Linhas com
+    colunas diferentes do cabeçalho existente são recusadas (ValueError) em
+    vez de gravadas pela metade.
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = Path(path)
+        self.fieldnames: Optional[List[str]] = None
+        self.done: Set[JobKey] = set()
+        if resume and self.path.exists():
+            self._repair_tail()
+            with open(self.path, newline="", encoding="utf-8") as f:
+                reader = csv.DictReader(f)
+                self.fieldnames = reader.fieldnames
+                if self.fieldnames and "repeat" in self.fieldnames:
+                    for row in reader:
+                        self.done.add(_row_key(row))
+            if self.fieldnames and "repeat" not in self.fieldnames:
+                legacy = self._move_aside()
+                print(f"   {self.path.name} não tem a coluna 'repeat' (formato antigo); "
+                      f"movido para {legacy.name} e a saída recomeça do zero")
+                self.fieldnames = None
+                resume = False
+        if not (resume and self.path.exists()):
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text("", encoding="utf-8")
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = None
+
+    def _move_aside(self) -> Path:
+        legacy = self.path.with_name(f"{self.path.stem}.legacy{self.path.suffix}")
+        n = 1
+        while legacy.exists():
+            legacy = self.path.with_name(f"{self.path.stem}.legacy{n}{self.path.suffix}")
+            n += 1
+        os.replace(self.path, legacy)
+        return legacy
+
+    def _repair_tail(self):
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def write(self, rows: List[dict]):
+        if not rows:
+            return
+        if self._writer is None:
+            if self.fieldnames is None:
+                self.fieldnames = list(rows[0].keys())
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+                self._writer.writeheader()
+            else:
+                keys = list(rows[0].keys())
+                if set(keys) != set(self.fieldnames):
+                    extra = [k for k in keys if k not in self.fieldnames]
+                    missing = [k for k in self.fieldnames if k not in keys]
+                    raise ValueError(
+                        f"As colunas de {self.path} não batem com as linhas novas "
+                        f"(faltam no arquivo: {extra}; faltam nas linhas: {missing}). "
+                        "Grave em outro arquivo ou rode sem --resume.")
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ColumnarSink:
+    """
+    Grava lotes de linhas como arquivos Parquet ou Arrow IPC numa pasta
+    (part-00000.parquet, ...). Cada parte é escrita num arquivo temporário e
+    renomeada, então uma queda perde no máximo o lote em memória.
+    Requer pyarrow.
+    """
+
+    def __init__(self, path: str, fmt: str = "parquet", batch_size: int = 10000, resume: bool = False):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("Saída Parquet/Arrow requer o pacote pyarrow (pip install pyarrow)") from e
+        self.path = Path(path)
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.done: Set[JobKey] = set()
+        self._buffer: List[dict] = []
+
+        if self.path.exists() and not resume:
+            for part in self._parts():
+                part.unlink()
+        self.path.mkdir(parents=True, exist_ok=True)
+        if resume:
+            df = read_results(self.path, columns=["maze_file", "algorithm", "repeat"])
+            self.done = {_row_key(r) for r in df.to_dict("records")}
+        self._next_part = len(self._parts())
+
+    def _parts(self):
+        return sorted(self.path.glob(f"part-*.{self.fmt}")) if self.path.exists() else []
+
+    def write(self, rows: List[dict]):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        import pyarrow as pa
+
+        df = pd.DataFrame(self._buffer)
+        if "cost" in df:
+            df["cost"] = df["cost"].astype("float64")  # None -> NaN, tipo estável entre partes
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        final = self.path / f"part-{self._next_part:05d}.{self.fmt}"
+        tmp = final.with_suffix(".tmp")
+        if self.fmt == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, tmp)
+        os.replace(tmp, final)
+        self._next_part += 1
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+
+
+def open_sink(path: str, resume: bool = False, batch_size: int = 10000):
+    """Escolhe o formato pela extensão: .csv, .parquet (pasta) ou .arrow (pasta)."""
+    fmt = COLUMNAR_FORMATS.get(Path(path).suffix.lower())
+    if fmt is None:
+        return CsvSink(path, resume=resume)
+    return ColumnarSink(path, fmt=fmt, batch_size=batch_size, resume=resume)
+
+
+def read_results(path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Lê resultados em CSV, Parquet ou Arrow (arquivo único ou pasta de partes)."""
+    path = Path(path)
+    fmt = COLUMNAR_FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        return pd.read_csv(path, usecols=columns)
+
+    files = _result_files(path, fmt)
+    reader = pd.read_parquet if fmt == "parquet" else pd.read_feather
+    frames = [reader(f, columns=columns) for f in files]
+    if not frames:
+        return pd.DataFrame(columns=columns or [])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _result_files(path: Path, fmt: str) -> List[Path]:
+    return sorted(path.glob(f"part-*.{fmt}")) if path.is_dir() else [path]
+
+
+def result_columns(path) -> List[str]:
+    """Colunas gravadas na saída, sem ler as linhas."""
+    path = Path(path)
+    fmt = COLUMNAR_FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        return list(pd.read_csv(path, nrows=0).columns)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    files = _result_files(path, fmt)
+    if not files:
+        return []
+    if fmt == "parquet":
+        return pq.ParquetFile(files[0]).schema_arrow.names
+    with pa.memory_map(str(files[0])) as source:
+        return pa.ipc.open_file(source).schema.names
+
+
+def iter_results(path, columns: Optional[List[str]] = None, chunksize: int = 500_000,
+                 dtype: Optional[Dict[str, str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê os resultados em blocos de até `chunksize` linhas, para saídas que não
+    cabem inteiras na memória. Colunas pedidas que não existem no arquivo são
+    ignoradas; `dtype` fixa o tipo de cada coluna (ex.: "category" para as
+    de texto repetido).
+    """
+    path = Path(path)
+    present = result_columns(path)
+    if columns is not None:
+        present = [c for c in columns if c in present]
+    types = {c: t for c, t in (dtype or {}).items() if c in present}
+
+    fmt = COLUMNAR_FORMATS.get(path.suffix.lower())
+    if fmt is None:
+        yield from pd.read_csv(path, usecols=present, dtype=types, chunksize=chunksize)
+        return
+
+    for f in _result_files(path, fmt):
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+            batches = (b.to_pandas() for b in pq.ParquetFile(f).iter_batches(batch_size=chunksize, columns=present))
+        else:
+            batches = [pd.read_feather(f, columns=present)]  # uma parte = um lote do ColumnarSink
+        for df in batches:
+            yield df.astype(types)
+
+
+def results_signature(path) -> List[List]:
+    """Tamanho e mtime de cada arquivo da saída: muda sempre que ela muda."""
+    path = Path(path)
+    fmt = COLUMNAR_FORMATS.get(path.suffix.lower(), "csv")
+    files = _result_files(path, fmt) if fmt != "csv" else [path]
+    return [[f.name, f.stat().st_size, f.stat().st_mtime_ns] for f in files]
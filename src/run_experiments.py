@@ -1,15 +1,153 @@
 # src/run_experiments.py
 import os
-import csv
+import gc
+import time
+import argparse
+import fnmatch
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
 from maze import Maze
-from heuristics import h_manhattan, h_euclidean
-from search import bfs_search, dfs_search, greedy_search, a_star_search
+from result_sink import open_sink, read_results
+from components import component_index
+from heuristics import landmark_heuristic
+from search import measure_memory
+from algorithms import ALGORITHMS
 
-def run_all_in_directory(data_dir: str, output_csv: str = "results_all.csv"):
+_ALGORITHMS_BY_NAME = dict(ALGORITHMS)
+
+
+def maze_info(maze_file: Path, mz: Maze):
+    """Extrai tamanho e densidade do nome do arquivo (ex.: labirinto_10x10_d20)."""
+    name_parts = maze_file.stem.split("_")
+    size = "?"
+    density = "?"
+    for part in name_parts:
+        if "x" in part:
+            size = part
+        elif part.startswith("d"):
+            density = part.replace("d", "") + "%"
+    if size == "?":
+        size = f"{mz.H}x{mz.W}"
+    return size, density
+
+
+# ----------------------------------------------------------------------
+# Execução de um job (labirinto × algoritmo), em processo separado ou não
+# ----------------------------------------------------------------------
+_maze_cache: Dict[str, Maze] = {}
+
+def _init_worker(cpu_counter, cpus):
+    # Fixa cada processo do pool num núcleo diferente (quando o SO permite)
+    if cpu_counter is not None and hasattr(os, "sched_setaffinity"):
+        with cpu_counter.get_lock():
+            idx = cpu_counter.value
+            cpu_counter.value += 1
+        os.sched_setaffinity(0, {cpus[idx % len(cpus)]})
+
+def _load_maze(path: str) -> Maze:
+    mz = _maze_cache.get(path)
+    if mz is None:
+        _maze_cache.clear()  # jobs chegam agrupados por labirinto
+        mz = _maze_cache[path] = Maze.from_file(path)
+        component_index(mz)  # uma vez por labirinto, fora da medição: consultas sem solução saem na hora
+    return mz
+
+def run_job(maze_path: str, algorithm: str, repeats: List[int], warmup: int = 1,
+            memory: bool = True) -> List[dict]:
     """
-    Executa todos os algoritmos (BFS, DFS, Gulosa, A*) em todos os labirintos .txt
-    presentes na pasta data_dir, salvando um CSV consolidado.
+    Roda `algorithm` no labirinto `maze_path`: `warmup` execuções descartadas
+    e depois uma execução medida para cada índice em `repeats`. Com memory=True
+    faz mais uma execução, fora da medição de tempo, só para medir memória.
+    Retorna uma linha por repetição.
+    """
+    maze_file = Path(maze_path)
+    mz = _load_maze(maze_path)
+    if algorithm.endswith("-Landmarks"):
+        landmark_heuristic(mz)  # pré-processamento (ou cache em disco) fora da medição de tempo
+    fn = _ALGORITHMS_BY_NAME[algorithm]
+    size, density = maze_info(maze_file, mz)
+
+    for _ in range(warmup):
+        fn(mz)
+
+    mem = measure_memory(fn, mz).metrics if memory else {}
+
+    rows = []
+    gc_was_enabled = gc.isenabled()
+    for rep in repeats:
+        gc.collect()
+        gc.disable()
+        try:
+            t0 = time.perf_counter()
+            res = fn(mz)
+            elapsed = time.perf_counter() - t0
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        rows.append({
+            "maze_file": maze_file.name,
+            "maze_size": size,
+            "maze_density": density,
+            "algorithm": algorithm,
+            "repeat": rep,
+            "found": res.found,
+            "cost": res.cost if res.found else None,
+            "time_s": round(elapsed, 9),
+            "nodes_generated": res.metrics.get("nodes_generated", 0),
+            "nodes_expanded": res.metrics.get("nodes_expanded", 0),
+            "max_frontier_size": res.metrics.get("max_frontier_size", 0),
+            "max_explored_size": res.metrics.get("max_explored_size", 0),
+            "path_length": len(res.path),
+            "peak_alloc_bytes": mem.get("peak_alloc_bytes"),
+            "bytes_per_node": mem.get("bytes_per_node"),
+            "peak_rss_delta_bytes": mem.get("peak_rss_delta_bytes"),
+        })
+    return rows
+
+def _run_job_args(args):
+    return run_job(*args)
+
+
+# ----------------------------------------------------------------------
+# Estatísticas de tempo por (labirinto, algoritmo)
+# ----------------------------------------------------------------------
+def timing_summary(df: pd.DataFrame) -> pd.DataFrame:
+    grouped = df.groupby(["maze_file", "algorithm"], sort=False)["time_s"]
+    summary = grouped.agg(
+        repeats="size",
+        time_min_s="min",
+        time_median_s="median",
+        time_p95_s=lambda t: t.quantile(0.95),
+        time_mean_s="mean",
+        time_std_s=lambda t: t.std(ddof=1) if t.size > 1 else 0.0,
+        time_iqr_s=lambda t: t.quantile(0.75) - t.quantile(0.25),
+    )
+    return summary.reset_index()
+
+
+def run_all_in_directory(data_dir: str, output_csv: str = "results_all.csv",
+                         workers: Optional[int] = None, repeats: int = 5, warmup: int = 1,
+                         pin_cpus: bool = False, algorithms: Optional[List[str]] = None,
+                         maze_glob: str = "*.txt", resume: bool = False, memory: bool = True):
+    """
+    Executa os algoritmos (BFS, DFS, Gulosa, A*, ...) em todos os labirintos
+    de data_dir que casam com maze_glob, salvando um CSV consolidado com uma
+    linha por repetição e um resumo de tempos (mín/mediana/p95/dispersão)
+    em <saída>.timing.csv.
+
+    Os jobs labirinto × algoritmo são distribuídos em `workers` processos
+    (1 = tudo no processo atual); `algorithms` aceita padrões glob sobre os
+    nomes (ex.: "A*-*").
+
+    As linhas são gravadas assim que cada job termina (CSV, ou Parquet/Arrow
+    conforme a extensão de output_csv). Com resume=True as repetições já
+    presentes na saída são puladas. Com memory=True cada job mede também o
+    pico real de alocação (tracemalloc) e de RSS numa execução extra.
     """
 
     # Caminhos e verificação
@@ -17,77 +155,91 @@ def run_all_in_directory(data_dir: str, output_csv: str = "results_all.csv"):
     if not data_path.exists():
         raise FileNotFoundError(f"Pasta de dados não encontrada: {data_dir}")
 
-    maze_files = sorted([f for f in data_path.glob("*.txt")])
+    maze_files = sorted(data_path.glob(maze_glob))
     if not maze_files:
-        raise FileNotFoundError("Nenhum arquivo .txt encontrado em data/")
+        raise FileNotFoundError(f"Nenhum arquivo '{maze_glob}' encontrado em {data_dir}")
 
+    names = [name for name, _ in ALGORITHMS
+             if algorithms is None or any(fnmatch.fnmatchcase(name, pat) for pat in algorithms)]
+    if not names:
+        raise ValueError(f"Nenhum algoritmo casa com {algorithms}")
+
+    workers = workers or os.cpu_count() or 1
     print(f"🧩 {len(maze_files)} labirintos encontrados em '{data_dir}'")
+    print(f"   {len(names)} algoritmos, {repeats} repetições (+{warmup} aquecimento), {workers} processo(s)")
 
-    algorithms = [
-    ("BFS", lambda m: bfs_search(m)),
-    ("DFS", lambda m: dfs_search(m)),
-    ("Greedy-Manhattan", lambda m: greedy_search(m, h_manhattan)),
-    ("A*-Manhattan", lambda m: a_star_search(m, h_manhattan)),
-    ("Greedy-Euclidean", lambda m: greedy_search(m, h_euclidean)),
-    ("A*-Euclidean", lambda m: a_star_search(m, h_euclidean)),
-]
+    output_path = Path(output_csv)
+    sink = open_sink(output_csv, resume=resume)
+    jobs = []
+    for f in maze_files:
+        for name in names:
+            pending = [r for r in range(repeats) if (f.name, name, r) not in sink.done]
+            if pending:
+                jobs.append((str(f), name, pending, warmup, memory))
+    skipped = len(maze_files) * len(names) * repeats - sum(len(j[2]) for j in jobs)
+    if skipped:
+        print(f"   retomando: {skipped} execuções já gravadas serão puladas")
 
-    rows = []
+    def collect(job_rows):
+        sink.write(job_rows)
+        r = job_rows[0]
+        median = float(np.median([x["time_s"] for x in job_rows]))
+        print(
+            f"  {r['maze_file']} | {r['algorithm']}: encontrado={r['found']}, "
+            f"custo={r['cost']}, tempo mediano={median:.6f}s, "
+            f"nós expandidos={r['nodes_expanded']}"
+        )
 
-    for maze_file in maze_files:
-        print(f"\n=== Executando algoritmos em {maze_file.name} ===")
-        mz = Maze.from_file(str(maze_file))
-
-        # Extrai informações do nome
-        name_parts = maze_file.stem.split("_")
-        size = "?"
-        density = "?"
-        for part in name_parts:
-            if "x" in part:
-                size = part
-            elif part.startswith("d"):
-                density = part.replace("d", "") + "%"
-        if size == "?":
-            size = f"{mz.H}x{mz.W}"
-
-        for name, fn in algorithms:
-            print(f"  Rodando {name} ...")
-            res = fn(mz)
+    try:
+        if workers == 1:
+            for job in jobs:
+                collect(run_job(*job))
+        elif jobs:
+            ctx = mp.get_context()
+            cpus = sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else []
+            cpu_counter = ctx.Value("i", 0) if pin_cpus and cpus else None
+            with ProcessPoolExecutor(workers, mp_context=ctx, initializer=_init_worker,
+                                     initargs=(cpu_counter, cpus)) as pool:
+                # chunks de um labirinto inteiro: cada processo carrega o arquivo uma vez
+                for job_rows in pool.map(_run_job_args, jobs, chunksize=len(names)):
+                    collect(job_rows)
+    finally:
+        sink.close()
 
-            row = {
-                "maze_file": maze_file.name,
-                "maze_size": size,
-                "maze_density": density,
-                "algorithm": name,
-                "found": res.found,
-                "cost": res.cost if res.found else None,
-                "time_s": round(res.time, 6),
-                "nodes_generated": res.metrics.get("nodes_generated", 0),
-                "nodes_expanded": res.metrics.get("nodes_expanded", 0),
-                "max_frontier_size": res.metrics.get("max_frontier_size", 0),
-                "max_explored_size": res.metrics.get("max_explored_size", 0),
-                "path_length": len(res.path),
-            }
-
-            rows.append(row)
-            print(
-                f"     {name}: encontrado={row['found']}, "
-                f"custo={row['cost']}, tempo={row['time_s']}s, "
-                f"nós expandidos={row['nodes_expanded']}"
-            )
-
-    # Salva CSV
-    output_path = Path(output_csv)
-    with open(output_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=rows[0].keys())
-        writer.writeheader()
-        writer.writerows(rows)
+    # Resumo de tempos, relido da saída (inclui execuções de rodadas anteriores)
+    df = read_results(output_path, columns=["maze_file", "algorithm", "repeat", "time_s", "nodes_expanded"])
+    # o sufixo fica no nome: results.csv e results.parquet não dividem o resumo
+    timing_path = output_path.with_name(output_path.name + ".timing.csv")
+    timing_summary(df).to_csv(timing_path, index=False, encoding="utf-8")
 
     print(f"\n Resultados salvos em: {output_path.resolve()}")
+    print(f" Resumo de tempos salvo em: {timing_path.resolve()}")
+
+    # Ganho da heurística de landmarks sobre Manhattan no A*
+    expanded = {(r.maze_file, r.algorithm): r.nodes_expanded for r in df[df["repeat"] == 0].itertuples()}
+    for maze_file in maze_files:
+        base = expanded.get((maze_file.name, "A*-Manhattan"))
+        alt = expanded.get((maze_file.name, "A*-Landmarks"))
+        if base and alt is not None:
+            print(f"  {maze_file.name}: A*-Landmarks expandiu {base - alt} nós a menos que "
+                  f"A*-Manhattan ({100 * (base - alt) / base:.1f}%)")
+
 
 if __name__ == "__main__":
     HERE = Path(__file__).parent
-    data_dir = os.path.join(HERE.parent, "data")
-    output_csv = os.path.join(HERE.parent, "results", "results_all.csv")
+    parser = argparse.ArgumentParser(description="Executa os algoritmos de busca nos labirintos")
+    parser.add_argument("--data-dir", default=os.path.join(HERE.parent, "data"))
+    parser.add_argument("--output", default=os.path.join(HERE.parent, "results", "results_all.csv"))
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: nº de CPUs)")
+    parser.add_argument("--repeats", type=int, default=5, help="execuções medidas por job")
+    parser.add_argument("--warmup", type=int, default=1, help="execuções descartadas por job")
+    parser.add_argument("--pin-cpus", action="store_true", help="fixa cada processo num núcleo")
+    parser.add_argument("--algorithms", nargs="*", default=None, help="padrões glob de algoritmos")
+    parser.add_argument("--maze-glob", default="*.txt", help="padrão glob dos labirintos")
+    parser.add_argument("--resume", action="store_true", help="pula execuções já gravadas na saída")
+    parser.add_argument("--no-memory", action="store_true", help="não mede a memória real de cada job")
+    args = parser.parse_args()
 
-    run_all_in_directory(data_dir, output_csv)
+    run_all_in_directory(args.data_dir, args.output, workers=args.workers, repeats=args.repeats,
+                         warmup=args.warmup, pin_cpus=args.pin_cpus, algorithms=args.algorithms,
+                         maze_glob=args.maze_glob, resume=args.resume, memory=not args.no_memory)
@@ -1,8 +1,13 @@
 # src/search.py
-from typing import Tuple, List, Dict, Optional, Callable
+from typing import Tuple, List, Dict, Optional, Callable, Iterable
 from collections import deque
+from array import array
 import heapq
 import time
+import tracemalloc
+import numpy as np
+from instrumentation import SearchHooks, as_hooks, overrides
+from indexed_heap import IndexedHeap
 
 Pos = Tuple[int,int]
 
@@ -15,21 +20,14 @@ class SearchResult:
         self.time = time
         self.metrics = metrics
 
-class Node:
-    def __init__(self, state: Pos, parent: Optional['Node']=None, action: Optional[str]=None, g: float=0.0):
-        self.state = state
-        self.parent = parent
-        self.action = action
-        self.g = g
-
-    def path(self) -> List[Pos]:
-        node, rev = self, []
-        while node is not None:
-            rev.append(node.state)
-            node = node.parent
-        return list(reversed(rev))
-
 def _common_metrics_init():
+    """
+    Métricas de toda busca. max_frontier_size é o maior número de entradas
+    na estrutura da fronteira: nas buscas com heapq e remoção preguiçosa
+    (A*, UCS, ...) inclui as entradas velhas ainda no heap, ou seja, mede a
+    memória da fronteira e não o número de células distintas abertas. Com
+    IndexedHeap (a_star_search com decrease_key=True) os dois coincidem.
+    """
     return {
         'nodes_generated': 0,
         'nodes_expanded': 0,
@@ -37,160 +35,1209 @@ def _common_metrics_init():
         'max_explored_size': 0
     }
 
-def bfs_search(maze) -> SearchResult:
+# ----------------------------------------------------------------------
+# Medição de memória real por execução
+# ----------------------------------------------------------------------
+def _proc_status_kb(field: str) -> Optional[int]:
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _reset_peak_rss() -> bool:
+    # Linux: escrever 5 em clear_refs zera o pico de RSS (VmHWM) do processo
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def measure_memory(search_fn: Callable[..., SearchResult], maze, *args, **kwargs) -> SearchResult:
+    """
+    Executa search_fn(maze, *args, **kwargs) medindo a memória de fato usada:
+    pico de alocação (tracemalloc) acima do que já estava alocado e, quando o
+    SO permite, o crescimento do pico de RSS durante a execução. Acrescenta
+    em metrics peak_alloc_bytes, bytes_per_node (por nó guardado na fronteira
+    + explorados) e peak_rss_delta_bytes (None se indisponível).
+    O tracemalloc deixa a busca mais lenta: não use o tempo desta execução.
+    """
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    rss_before = _proc_status_kb('VmRSS') if _reset_peak_rss() else None
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    try:
+        res = search_fn(maze, *args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    hwm = _proc_status_kb('VmHWM') if rss_before is not None else None
+
+    stored = res.metrics.get('max_frontier_size', 0) + res.metrics.get('max_explored_size', 0)
+    res.metrics['peak_alloc_bytes'] = peak - base
+    res.metrics['bytes_per_node'] = (peak - base) / max(1, stored)
+    res.metrics['peak_rss_delta_bytes'] = (hwm - rss_before) * 1024 if hwm is not None else None
+    return res
+
+# ----------------------------------------------------------------------
+# Núcleo compartilhado: estados são ids inteiros de célula (ver Maze.cell_id).
+# Pais e custos ficam em arrays pré-alocados do tamanho do grid e a pertinência
+# à fronteira/explorados num bytearray; o caminho só é montado no sucesso.
+# ----------------------------------------------------------------------
+UNSEEN, FRONTIER, CLOSED = 0, 1, 2
+
+def _kernel_arrays(maze):
+    parent = array('i', [-1]) * maze.N
+    status = bytearray(maze.N)
+    return parent, status
+
+def _kernel_path(maze, parent, goal: int) -> List[Pos]:
+    W = maze.W
+    rev = []
+    cell = goal
+    while cell != -1:
+        rev.append(divmod(cell, W))
+        cell = parent[cell]
+    rev.reverse()
+    return rev
+
+def _known_unreachable(maze, s: int, goal: int) -> bool:
+    # Só consulta o índice de componentes se ele já estiver em maze.derived
+    # (montado antes por quem chama: component_index(maze)). Montá-lo aqui
+    # poria um pré-processamento O(N), e um array do tamanho do grid, dentro
+    # de cada busca isolada.
+    index = maze.derived.get('components')
+    return index is not None and not index.connected(s, goal)
+
+def _unreachable(metrics, start_time: float) -> SearchResult:
+    # objetivo fora da componente do início (ver components.py): nenhuma
+    # busca o alcançaria, então a resposta sai sem expandir nada
+    metrics['unreachable'] = True
+    return SearchResult(False, [], float('inf'), time.perf_counter() - start_time, metrics)
+
+# Desempate entre prioridades iguais na fronteira das buscas informadas:
+# ordem de inserção (fifo/lifo) ou maior/menor g
+TIE_BREAKS = ('fifo', 'lifo', 'high_g', 'low_g')
+
+def _tie_mode(tie_break: str) -> int:
+    if tie_break not in TIE_BREAKS:
+        raise ValueError(f"Desempate desconhecido: {tie_break} (opções: {', '.join(TIE_BREAKS)})")
+    return TIE_BREAKS.index(tie_break)
+
+def _tie_value(mode: int, counter: int, g: float) -> float:
+    return counter if mode == 0 else -counter if mode == 1 else -g if mode == 2 else g
+
+def bfs_search(maze, hooks=None) -> SearchResult:
+    if hooks is not None:
+        return _instrumented_search(maze, 'bfs', hooks=hooks)
     start_time = time.perf_counter()
     metrics = _common_metrics_init()
 
-    start = Node(maze.start, g=0.0)
-    if maze.goal_test(start.state):
-        return SearchResult(True, [start.state], 0.0, 0.0, metrics)
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
 
-    frontier = deque([start])
-    explored = set()
-    metrics['max_frontier_size'] = max(metrics['max_frontier_size'], len(frontier))
+    parent, status = _kernel_arrays(maze)
+    moves, mask = maze.moves, maze.nbr_mask
+    frontier = deque([s])
+    status[s] = FRONTIER
+    generated = expanded = n_explored = 0
+    max_frontier, max_explored = 1, 0
 
     while frontier:
-        node = frontier.popleft()
-        metrics['nodes_expanded'] += 1
-        explored.add(node.state)
+        u = frontier.popleft()
+        expanded += 1
+        status[u] = CLOSED
+        n_explored += 1
 
-        if maze.goal_test(node.state):
+        if u == goal:
+            metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                           max_frontier_size=max_frontier, max_explored_size=max_explored)
+            path = _kernel_path(maze, parent, u)
             elapsed = time.perf_counter() - start_time
-            return SearchResult(True, node.path(), node.g, elapsed, metrics)
+            return SearchResult(True, path, float(len(path) - 1), elapsed, metrics)
 
-        for a in maze.actions(node.state):
-            q = maze.result(node.state, a)
-            metrics['nodes_generated'] += 1
-            if q not in explored and not any(n.state == q for n in frontier):
-                child = Node(q, parent=node, action=a, g=node.g + maze.step_cost(node.state, a, q))
-                frontier.append(child)
-                metrics['max_frontier_size'] = max(metrics['max_frontier_size'], len(frontier))
-        metrics['max_explored_size'] = max(metrics['max_explored_size'], len(explored))
+        for d in moves[mask[u]]:
+            q = u + d
+            generated += 1
+            if not status[q]:
+                status[q] = FRONTIER
+                parent[q] = u
+                frontier.append(q)
+                if len(frontier) > max_frontier:
+                    max_frontier = len(frontier)
+        if n_explored > max_explored:
+            max_explored = n_explored
 
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored)
     elapsed = time.perf_counter() - start_time
     return SearchResult(False, [], float('inf'), elapsed, metrics)
 
-def dfs_search(maze, depth_limit=None) -> SearchResult:
+def dfs_search(maze, depth_limit=None, hooks=None) -> SearchResult:
+    if hooks is not None:
+        return _instrumented_search(maze, 'dfs', depth_limit=depth_limit, hooks=hooks)
     start_time = time.perf_counter()
     metrics = _common_metrics_init()
-    start = Node(maze.start, g=0.0)
-    if maze.goal_test(start.state):
-        return SearchResult(True, [start.state], 0.0, 0.0, metrics)
 
-    frontier = [start]  # stack
-    explored = set()
-    metrics['max_frontier_size'] = max(metrics['max_frontier_size'], len(frontier))
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    parent, status = _kernel_arrays(maze)
+    g = array('d', [0.0]) * maze.N
+    moves, mask = maze.moves, maze.nbr_mask
+    frontier = [s]  # stack
+    status[s] = FRONTIER
+    generated = expanded = n_explored = 0
+    max_frontier, max_explored = 1, 0
 
     while frontier:
-        node = frontier.pop()
-        metrics['nodes_expanded'] += 1
-        explored.add(node.state)
+        u = frontier.pop()
+        expanded += 1
+        status[u] = CLOSED
+        n_explored += 1
 
-        if maze.goal_test(node.state):
+        if u == goal:
+            metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                           max_frontier_size=max_frontier, max_explored_size=max_explored)
             elapsed = time.perf_counter() - start_time
-            return SearchResult(True, node.path(), node.g, elapsed, metrics)
+            return SearchResult(True, _kernel_path(maze, parent, u), g[u], elapsed, metrics)
 
         # optional depth limit
-        if depth_limit is None or node.g < depth_limit:
-            for a in maze.actions(node.state):
-                q = maze.result(node.state, a)
-                metrics['nodes_generated'] += 1
-                if q not in explored and not any(n.state == q for n in frontier):
-                    child = Node(q, parent=node, action=a, g=node.g + maze.step_cost(node.state, a, q))
-                    frontier.append(child)
-                    metrics['max_frontier_size'] = max(metrics['max_frontier_size'], len(frontier))
-        metrics['max_explored_size'] = max(metrics['max_explored_size'], len(explored))
+        if depth_limit is None or g[u] < depth_limit:
+            gq = g[u] + 1.0
+            for d in moves[mask[u]]:
+                q = u + d
+                generated += 1
+                if not status[q]:
+                    status[q] = FRONTIER
+                    parent[q] = u
+                    g[q] = gq
+                    frontier.append(q)
+                    if len(frontier) > max_frontier:
+                        max_frontier = len(frontier)
+        if n_explored > max_explored:
+            max_explored = n_explored
 
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored)
     elapsed = time.perf_counter() - start_time
     return SearchResult(False, [], float('inf'), elapsed, metrics)
 
-def _push_heap(heap, priority, counter, node):
-    heapq.heappush(heap, (priority, counter, node))
-
-def greedy_search(maze, heuristic: Callable[[Pos, Pos], float]) -> SearchResult:
+def greedy_search(maze, heuristic: Callable[[Pos, Pos], float], hooks=None,
+                  tie_break: str = 'fifo') -> SearchResult:
+    if hooks is not None:
+        return _instrumented_search(maze, 'greedy', heuristic=heuristic, hooks=hooks, tie_break=tie_break)
     start_time = time.perf_counter()
     metrics = _common_metrics_init()
-    start = Node(maze.start, g=0.0)
-    if maze.goal_test(start.state):
-        return SearchResult(True, [start.state], 0.0, 0.0, metrics)
+    mode = _tie_mode(tie_break)
 
-    heap = []
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    parent, status = _kernel_arrays(maze)
+    g = array('d', [0.0]) * maze.N
+    moves, mask, W, goal_pos = maze.moves, maze.nbr_mask, maze.W, maze.goal
+
+    # h só depende da célula: cada célula entra uma vez na fronteira, com o
+    # pai que a gerou primeiro, e nunca há entradas velhas no heap
+    heappush, heappop = heapq.heappush, heapq.heappop
+    heap = [(heuristic(maze.start, goal_pos), 0, s)]
+    status[s] = FRONTIER
     counter = 0
-    _push_heap(heap, heuristic(start.state, maze.goal), counter, start)
-    metrics['max_frontier_size'] = max(metrics['max_frontier_size'], len(heap))
-    explored = set()
+    generated = expanded = n_explored = 0
+    max_frontier, max_explored = 1, 0
 
     while heap:
-        _, _, node = heapq.heappop(heap)
-        metrics['nodes_expanded'] += 1
-        if node.state in explored:
-            continue
-        explored.add(node.state)
+        u = heappop(heap)[2]
+        expanded += 1
+        status[u] = CLOSED
+        n_explored += 1
 
-        if maze.goal_test(node.state):
+        if u == goal:
+            metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                           max_frontier_size=max_frontier, max_explored_size=max_explored)
             elapsed = time.perf_counter() - start_time
-            return SearchResult(True, node.path(), node.g, elapsed, metrics)
+            return SearchResult(True, _kernel_path(maze, parent, u), g[u], elapsed, metrics)
 
-        for a in maze.actions(node.state):
-            q = maze.result(node.state, a)
-            metrics['nodes_generated'] += 1
-            if q not in explored:
-                child = Node(q, parent=node, action=a, g=node.g + maze.step_cost(node.state, a, q))
+        gq = g[u] + 1.0
+        for d in moves[mask[u]]:
+            q = u + d
+            generated += 1
+            if status[q] == UNSEEN:
+                status[q] = FRONTIER
+                g[q] = gq
+                parent[q] = u
                 counter += 1
-                priority = heuristic(child.state, maze.goal)
-                _push_heap(heap, priority, counter, child)
-                metrics['max_frontier_size'] = max(metrics['max_frontier_size'], len(heap))
-        metrics['max_explored_size'] = max(metrics['max_explored_size'], len(explored))
+                tie = counter if mode == 0 else -counter if mode == 1 else -gq if mode == 2 else gq
+                heappush(heap, (heuristic(divmod(q, W), goal_pos), tie, q))
+                if len(heap) > max_frontier:
+                    max_frontier = len(heap)
+        if n_explored > max_explored:
+            max_explored = n_explored
 
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored)
     elapsed = time.perf_counter() - start_time
     return SearchResult(False, [], float('inf'), elapsed, metrics)
 
-def a_star_search(maze, heuristic: Callable[[Pos, Pos], float]) -> SearchResult:
+def a_star_search(maze, heuristic: Callable[[Pos, Pos], float], hooks=None,
+                  tie_break: str = 'fifo', decrease_key: bool = False) -> SearchResult:
+    """
+    A* com fronteira em heapq e remoção preguiçosa: melhorar o g de uma
+    célula empilha uma entrada nova, e as velhas são descartadas quando saem
+    do heap. Com decrease_key=True a fronteira é um IndexedHeap, que
+    atualiza a entrada da célula no lugar (sem duplicatas, mas cada operação
+    roda em Python e sai mais cara que o heapq). tie_break escolhe a ordem
+    entre f iguais (ver TIE_BREAKS); 'high_g' costuma expandir bem menos nós
+    em grids abertos.
+    """
+    if hooks is not None:
+        return _instrumented_search(maze, 'astar', heuristic=heuristic, hooks=hooks, tie_break=tie_break,
+                                    decrease_key=decrease_key)
     start_time = time.perf_counter()
     metrics = _common_metrics_init()
-    start = Node(maze.start, g=0.0)
-    if maze.goal_test(start.state):
-        return SearchResult(True, [start.state], 0.0, 0.0, metrics)
+    mode = _tie_mode(tie_break)
 
-    open_heap = []
-    counter = 0
-    start_f = start.g + heuristic(start.state, maze.goal)
-    _push_heap(open_heap, start_f, counter, start)
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+    if decrease_key:
+        return _a_star_indexed(maze, heuristic, mode, metrics, start_time)
+
+    parent, status = _kernel_arrays(maze)
+    g_score = array('d', [0.0]) * maze.N
+    moves, mask, W, goal_pos = maze.moves, maze.nbr_mask, maze.W, maze.goal
+    heappush, heappop = heapq.heappush, heapq.heappop
 
-    came_from = {start.state: start}
-    g_score = {start.state: 0.0}
-    closed = set()
-    metrics['max_frontier_size'] = max(metrics['max_frontier_size'], len(open_heap))
+    # como cada melhoria de g gera uma entrada com f menor, a primeira entrada
+    # retirada para uma célula é sempre a última empilhada: o pai pode ser
+    # gravado já no push, e entradas antigas são descartadas pelo status
+    open_heap = [(heuristic(maze.start, goal_pos), 0, s)]
+    status[s] = FRONTIER
+    counter = 0
+    generated = expanded = n_closed = 0
+    max_frontier, max_explored = 1, 0
 
     while open_heap:
-        _, _, current = heapq.heappop(open_heap)
-        if current.state in closed:
+        u = heappop(open_heap)[2]
+        if status[u] == CLOSED:
             continue
 
-        metrics['nodes_expanded'] += 1
-        if maze.goal_test(current.state):
+        expanded += 1
+        if u == goal:
+            metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                           max_frontier_size=max_frontier, max_explored_size=max_explored)
             elapsed = time.perf_counter() - start_time
-            return SearchResult(True, current.path(), current.g, elapsed, metrics)
+            return SearchResult(True, _kernel_path(maze, parent, u), g_score[u], elapsed, metrics)
+
+        status[u] = CLOSED
+        n_closed += 1
+        tentative_g = g_score[u] + 1.0
+
+        for d in moves[mask[u]]:
+            q = u + d
+            generated += 1
+            st = status[q]
+            if st == CLOSED:
+                continue
+
+            if st == UNSEEN or tentative_g < g_score[q]:
+                status[q] = FRONTIER
+                g_score[q] = tentative_g
+                parent[q] = u
+                counter += 1
+                tie = (counter if mode == 0 else -counter if mode == 1
+                       else -tentative_g if mode == 2 else tentative_g)
+                heappush(open_heap, (tentative_g + heuristic(divmod(q, W), goal_pos), tie, q))
+                if len(open_heap) > max_frontier:
+                    max_frontier = len(open_heap)
+
+        if n_closed > max_explored:
+            max_explored = n_closed
+
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored)
+    elapsed = time.perf_counter() - start_time
+    return SearchResult(False, [], float('inf'), elapsed, metrics)
+
+def _a_star_indexed(maze, heuristic, mode: int, metrics, start_time: float) -> SearchResult:
+    # a_star_search com decrease_key=True: mesmos custos, fronteira sem
+    # entradas repetidas (f e desempate iguais podem sair em outra ordem)
+    s, goal = maze.start_id, maze.goal_id
+    parent, status = _kernel_arrays(maze)
+    g_score = array('d', [0.0]) * maze.N
+    moves, mask, W, goal_pos = maze.moves, maze.nbr_mask, maze.W, maze.goal
+
+    open_list = IndexedHeap(maze.N)
+    push, pop = open_list.push, open_list.pop
+    push(s, heuristic(maze.start, goal_pos), 0.0)
+    status[s] = FRONTIER
+    counter = 0
+    generated = expanded = n_closed = 0
+    max_frontier, max_explored = 1, 0
+
+    while open_list:
+        u = pop()
+        expanded += 1
+        if u == goal:
+            metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                           max_frontier_size=max_frontier, max_explored_size=max_explored)
+            elapsed = time.perf_counter() - start_time
+            return SearchResult(True, _kernel_path(maze, parent, u), g_score[u], elapsed, metrics)
+
+        status[u] = CLOSED
+        n_closed += 1
+        tentative_g = g_score[u] + 1.0
+
+        for d in moves[mask[u]]:
+            q = u + d
+            generated += 1
+            st = status[q]
+            if st == CLOSED:
+                continue
+
+            if st == UNSEEN or tentative_g < g_score[q]:
+                status[q] = FRONTIER
+                g_score[q] = tentative_g
+                parent[q] = u
+                counter += 1
+                tie = (counter if mode == 0 else -counter if mode == 1
+                       else -tentative_g if mode == 2 else tentative_g)
+                push(q, tentative_g + heuristic(divmod(q, W), goal_pos), tie)
+                if len(open_list) > max_frontier:
+                    max_frontier = len(open_list)
+
+        if n_closed > max_explored:
+            max_explored = n_closed
+
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored)
+    elapsed = time.perf_counter() - start_time
+    return SearchResult(False, [], float('inf'), elapsed, metrics)
+
+# ----------------------------------------------------------------------
+# Caminho instrumentado: usado só quando a busca recebe hooks. Reproduz a
+# mesma ordem de expansão e as mesmas métricas das quatro buscas acima,
+# chamando os eventos e, se pedido, cronometrando cada fase.
+# ----------------------------------------------------------------------
+def _instrumented_search(maze, kind: str, heuristic=None, depth_limit=None,
+                         hooks: Optional[SearchHooks] = None, tie_break: str = 'fifo',
+                         decrease_key: bool = False) -> SearchResult:
+    hooks = as_hooks(hooks)
+    mode = _tie_mode(tie_break)
+    on_expand = hooks.on_expand if overrides(hooks, 'on_expand') else None
+    on_generate = hooks.on_generate if overrides(hooks, 'on_generate') else None
+    profile = hooks.profile_phases
+    clock = time.perf_counter
+    phase = {'heuristic': 0.0, 'neighbors': 0.0, 'frontier': 0.0}
+
+    start_time = clock()
+    metrics = _common_metrics_init()
+
+    def finish(result: SearchResult) -> SearchResult:
+        if profile:
+            result.metrics['phase_times'] = dict(phase)
+            hooks.on_phase_times(dict(phase))
+        if result.found:
+            hooks.on_goal(result)
+        return result
+
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return finish(SearchResult(True, [maze.start], 0.0, 0.0, metrics))
+    if _known_unreachable(maze, s, goal):
+        return finish(_unreachable(metrics, start_time))
+
+    parent, status = _kernel_arrays(maze)
+    g = array('d', [0.0]) * maze.N
+    moves, mask, W, goal_pos = maze.moves, maze.nbr_mask, maze.W, maze.goal
+
+    def h(cell: int) -> float:
+        if not profile:
+            return heuristic(divmod(cell, W), goal_pos)
+        t0 = clock()
+        value = heuristic(divmod(cell, W), goal_pos)
+        phase['heuristic'] += clock() - t0
+        return value
+
+    informed = kind in ('greedy', 'astar')
+    lazy = informed and not decrease_key  # heapq: o A* pode ter entradas velhas
+    if lazy:
+        # entradas (prioridade, desempate, célula)
+        frontier = [(h(s), 0, s)]
+        pop = lambda: heapq.heappop(frontier)[2]
+        push = lambda entry: heapq.heappush(frontier, (entry[1], entry[2], entry[0]))
+    elif informed:
+        # entradas (célula, prioridade, desempate)
+        frontier = IndexedHeap(maze.N)
+        frontier.push(s, h(s), 0.0)
+        pop = frontier.pop
+        push = lambda entry: frontier.push(*entry)
+    else:
+        frontier = deque([s]) if kind == 'bfs' else [s]
+        pop = frontier.popleft if kind == 'bfs' else frontier.pop
+        push = frontier.append
+    status[s] = FRONTIER
+
+    counter = 0
+    generated = expanded = n_closed = 0
+    max_frontier, max_explored = 1, 0
+    found = False
+
+    while frontier:
+        t0 = clock() if profile else 0.0
+        u = pop()
+        if profile:
+            phase['frontier'] += clock() - t0
+        if lazy and status[u] == CLOSED:
+            continue
+
+        expanded += 1
+        if kind != 'astar':
+            status[u] = CLOSED
+            n_closed += 1
+        if on_expand is not None:
+            on_expand(divmod(u, W), g[u])
+
+        if u == goal:
+            found = True
+            break
+        if kind == 'astar':
+            status[u] = CLOSED
+            n_closed += 1
+
+        if kind == 'dfs' and depth_limit is not None and not g[u] < depth_limit:
+            children = ()
+        elif profile:
+            t0 = clock()
+            children = [u + d for d in moves[mask[u]]]
+            phase['neighbors'] += clock() - t0
+        else:
+            children = [u + d for d in moves[mask[u]]]
+
+        gq = g[u] + 1.0
+        for q in children:
+            generated += 1
+            if on_generate is not None:
+                on_generate(divmod(u, W), divmod(q, W))
+            st = status[q]
+            if kind == 'greedy':
+                if st:
+                    continue
+                status[q] = FRONTIER
+                g[q] = gq
+                parent[q] = u
+                counter += 1
+                entry = (q, h(q), _tie_value(mode, counter, gq))
+            elif kind == 'astar':
+                if st == CLOSED or not (st == UNSEEN or gq < g[q]):
+                    continue
+                status[q] = FRONTIER
+                g[q] = gq
+                parent[q] = u
+                counter += 1
+                entry = (q, gq + h(q), _tie_value(mode, counter, gq))
+            else:
+                if st:
+                    continue
+                status[q] = FRONTIER
+                g[q] = gq
+                parent[q] = u
+                entry = q
+            t0 = clock() if profile else 0.0
+            push(entry)
+            if profile:
+                phase['frontier'] += clock() - t0
+            if len(frontier) > max_frontier:
+                max_frontier = len(frontier)
+        if n_closed > max_explored:
+            max_explored = n_closed
+
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored)
+    elapsed = clock() - start_time
+    if not found:
+        return finish(SearchResult(False, [], float('inf'), elapsed, metrics))
+    return finish(SearchResult(True, _kernel_path(maze, parent, goal), g[goal], elapsed, metrics))
+
+# ----------------------------------------------------------------------
+# Frente de onda vetorizada: BFS por níveis sobre arrays NumPy. Cada passo
+# expande a fronteira inteira de uma vez a partir das máscaras de vizinhança.
+# ----------------------------------------------------------------------
+def _wavefront(maze, sources: List[int], target: int = -1):
+    return _masked_wavefront(np.frombuffer(maze.nbr_mask, dtype=np.uint8), maze.W, sources, target)
+
+def _masked_wavefront(mask: np.ndarray, W: int, sources: List[int], target: int = -1):
+    # mesma onda sobre uma tabela de máscaras qualquer (um recorte do grid,
+    # ou o grid com ligações removidas), com ids r * W + c dessa tabela
+    metrics = _common_metrics_init()
+    dist = np.full(mask.size, -1, dtype=np.int32)
+    # para tirar repetidos da nova camada sem ordenar: cada célula guarda a
+    # última posição em que apareceu, e só essa ocorrência fica
+    owner = np.empty(mask.size, dtype=np.int64)
+    offsets = (-W, W, -1, 1)
+
+    frontier = np.unique(np.asarray(sources, dtype=np.int64))
+    dist[frontier] = 0
+    reached = frontier.size
+    max_frontier = frontier.size
+    generated = expanded = 0
+    step = 0
+
+    while frontier.size and not (target >= 0 and dist[target] >= 0):
+        m = mask[frontier]
+        cand = np.concatenate([frontier[(m & (1 << k)) != 0] + off
+                               for k, off in enumerate(offsets)])
+        expanded += frontier.size
+        generated += cand.size
+        cand = cand[dist[cand] < 0]
+        idx = np.arange(cand.size)
+        owner[cand] = idx
+        frontier = cand[owner[cand] == idx]
+        step += 1
+        dist[frontier] = step
+        reached += frontier.size
+        max_frontier = max(max_frontier, frontier.size)
+
+    metrics.update(nodes_generated=int(generated), nodes_expanded=int(expanded),
+                   max_frontier_size=int(max_frontier), max_explored_size=int(reached))
+    return dist, metrics
+
+def distance_field(maze, sources: Optional[Iterable[Pos]] = None) -> np.ndarray:
+    """
+    Distância (em passos) de cada célula até a fonte mais próxima.
+    Retorna um array H x W de int32, com -1 nas células inalcançáveis.
+    Por padrão a única fonte é maze.start.
+    """
+    if sources is None:
+        sources = [maze.start]
+    dist, _ = _wavefront(maze, [maze.cell_id(p) for p in sources])
+    return dist.reshape(maze.H, maze.W)
+
+def _descend_gradient(maze, dist, cell: int) -> List[Pos]:
+    # anda do alvo até uma fonte sempre para um vizinho com distância d - 1
+    moves, mask, W = maze.moves, maze.nbr_mask, maze.W
+    d = int(dist[cell])
+    rev = [divmod(cell, W)]
+    while d > 0:
+        for off in moves[mask[cell]]:
+            if dist[cell + off] == d - 1:
+                cell += off
+                break
+        d -= 1
+        rev.append(divmod(cell, W))
+    rev.reverse()
+    return rev
+
+def wavefront_search(maze, sources: Optional[Iterable[Pos]] = None,
+                     full_field: bool = False) -> SearchResult:
+    """
+    Busca em largura vetorizada de uma ou mais fontes até maze.goal.
+    Com full_field=True a onda percorre o grid inteiro (e o campo de
+    distâncias fica em metrics['distance_field']); caso contrário para
+    assim que o objetivo é alcançado.
+    """
+    start_time = time.perf_counter()
+    if sources is None:
+        sources = [maze.start]
+    source_ids = [maze.cell_id(p) for p in sources]
+    if not full_field:
+        index = maze.derived.get('components')  # só se já montado (ver _known_unreachable)
+        if index is not None and not any(index.connected(x, maze.goal_id) for x in source_ids):
+            return _unreachable(_common_metrics_init(), start_time)
+    dist, metrics = _wavefront(maze, source_ids, -1 if full_field else maze.goal_id)
+    if full_field:
+        metrics['distance_field'] = dist.reshape(maze.H, maze.W)
+
+    if dist[maze.goal_id] < 0:
+        elapsed = time.perf_counter() - start_time
+        return SearchResult(False, [], float('inf'), elapsed, metrics)
+
+    path = _descend_gradient(maze, dist, maze.goal_id)
+    elapsed = time.perf_counter() - start_time
+    return SearchResult(True, path, float(len(path) - 1), elapsed, metrics)
+
+# ----------------------------------------------------------------------
+# Buscas bidirecionais: uma frente a partir de start e outra a partir de goal.
+# Como o grid é não direcionado, a frente reversa usa a mesma vizinhança.
+# ----------------------------------------------------------------------
+def _bidirectional_path(maze, parent_f, parent_b, meet: int) -> List[Pos]:
+    path = _kernel_path(maze, parent_f, meet)
+    W = maze.W
+    cell = parent_b[meet]
+    while cell != -1:
+        path.append(divmod(cell, W))
+        cell = parent_b[cell]
+    return path
+
+def _bidirectional_metrics(metrics, sides, max_frontier, meet, maze):
+    fwd, bwd = sides
+    metrics.update(
+        nodes_generated=fwd['generated'] + bwd['generated'],
+        nodes_expanded=fwd['expanded'] + bwd['expanded'],
+        max_frontier_size=max_frontier,
+        max_explored_size=fwd['closed'] + bwd['closed'],
+        forward_expanded=fwd['expanded'],
+        backward_expanded=bwd['expanded'],
+        forward_reached=fwd['reached'],
+        backward_reached=bwd['reached'],
+        meeting_point=maze.pos(meet) if meet != -1 else None,
+    )
+
+def bidirectional_bfs_search(maze) -> SearchResult:
+    """
+    BFS bidirecional por camadas: expande sempre a camada inteira da frente
+    menor. Ao terminar a primeira camada em que as frentes se tocam, o menor
+    dist_f + dist_b entre os encontros daquela camada é ótimo.
+    """
+    start_time = time.perf_counter()
+    metrics = _common_metrics_init()
+
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
 
-        closed.add(current.state)
+    moves, mask = maze.moves, maze.nbr_mask
+    dist_f = array('i', [-1]) * maze.N
+    dist_b = array('i', [-1]) * maze.N
+    parent_f = array('i', [-1]) * maze.N
+    parent_b = array('i', [-1]) * maze.N
+    dist_f[s] = 0
+    dist_b[goal] = 0
+    layers = [[s], [goal]]
+    sides = [dict(generated=0, expanded=0, closed=0, reached=1) for _ in range(2)]
+    max_frontier = 2
+    best, meet = -1, -1
+
+    while layers[0] and layers[1] and meet == -1:
+        side = 0 if len(layers[0]) <= len(layers[1]) else 1
+        dist, other, parent = (dist_f, dist_b, parent_f) if side == 0 else (dist_b, dist_f, parent_b)
+        layer = layers[side]
+        next_layer = []
+        generated = 0
+        for u in layer:
+            du = dist[u] + 1
+            for d in moves[mask[u]]:
+                q = u + d
+                generated += 1
+                if dist[q] == -1:
+                    dist[q] = du
+                    parent[q] = u
+                    next_layer.append(q)
+                    if other[q] != -1 and (best == -1 or du + other[q] < best):
+                        best, meet = du + other[q], q
+        stats = sides[side]
+        stats['generated'] += generated
+        stats['expanded'] += len(layer)
+        stats['closed'] += len(layer)
+        stats['reached'] += len(next_layer)
+        layers[side] = next_layer
+        max_frontier = max(max_frontier, len(layers[0]) + len(layers[1]))
+
+    _bidirectional_metrics(metrics, sides, max_frontier, meet, maze)
+    elapsed = time.perf_counter() - start_time
+    if meet == -1:
+        return SearchResult(False, [], float('inf'), elapsed, metrics)
+    path = _bidirectional_path(maze, parent_f, parent_b, meet)
+    return SearchResult(True, path, float(best), elapsed, metrics)
 
-        for a in maze.actions(current.state):
-            q = maze.result(current.state, a)
-            tentative_g = current.g + maze.step_cost(current.state, a, q)
-            metrics['nodes_generated'] += 1
+def bidirectional_a_star_search(maze, heuristic: Callable[[Pos, Pos], float]) -> SearchResult:
+    """
+    A* bidirecional (front-to-end): a frente direta estima a distância até
+    goal e a reversa até start. Mantém o melhor custo de encontro mu e para
+    quando mu <= max(f_min direto, f_min reverso), o que preserva a
+    otimalidade para heurísticas consistentes (Manhattan/Euclidiana no grid).
+    """
+    start_time = time.perf_counter()
+    metrics = _common_metrics_init()
+
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    moves, mask, W = maze.moves, maze.nbr_mask, maze.W
+    heappush, heappop = heapq.heappush, heapq.heappop
+    inf = float('inf')
+    g = [array('d', [inf]) * maze.N, array('d', [inf]) * maze.N]
+    parent = [array('i', [-1]) * maze.N, array('i', [-1]) * maze.N]
+    closed = [bytearray(maze.N), bytearray(maze.N)]
+    targets = [maze.goal, maze.start]
+    g[0][s] = 0.0
+    g[1][goal] = 0.0
+    heaps = [[(heuristic(maze.start, maze.goal), 0, s)], [(heuristic(maze.goal, maze.start), 0, goal)]]
+    sides = [dict(generated=0, expanded=0, closed=0, reached=1) for _ in range(2)]
+    counter = 0
+    max_frontier = 2
+    mu, meet = inf, -1
 
-            if q in closed:
+    while heaps[0] and heaps[1]:
+        # descarta entradas obsoletas do topo para que o f mínimo seja real
+        for k in (0, 1):
+            heap = heaps[k]
+            while heap and closed[k][heap[0][2]]:
+                heappop(heap)
+        if not heaps[0] or not heaps[1]:
+            break
+        if mu <= max(heaps[0][0][0], heaps[1][0][0]):
+            break
+
+        side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        heap, gs, gt, par, cl = heaps[side], g[side], g[1 - side], parent[side], closed[side]
+        target = targets[side]
+        stats = sides[side]
+
+        _, _, u = heappop(heap)
+        cl[u] = 1
+        stats['expanded'] += 1
+        stats['closed'] += 1
+        tentative_g = gs[u] + 1.0
+
+        for d in moves[mask[u]]:
+            q = u + d
+            stats['generated'] += 1
+            if cl[q] or tentative_g >= gs[q]:
                 continue
+            if gs[q] == inf:
+                stats['reached'] += 1
+            gs[q] = tentative_g
+            par[q] = u
+            counter += 1
+            heappush(heap, (tentative_g + heuristic(divmod(q, W), target), counter, q))
+            if tentative_g + gt[q] < mu:
+                mu, meet = tentative_g + gt[q], q
+        max_frontier = max(max_frontier, len(heaps[0]) + len(heaps[1]))
+
+    _bidirectional_metrics(metrics, sides, max_frontier, meet, maze)
+    elapsed = time.perf_counter() - start_time
+    if meet == -1:
+        return SearchResult(False, [], float('inf'), elapsed, metrics)
+    path = _bidirectional_path(maze, parent[0], parent[1], meet)
+    return SearchResult(True, path, mu, elapsed, metrics)
+
+# ----------------------------------------------------------------------
+# Jump Point Search (grid 4-conexo, custo uniforme).
+# Ordem canônica "vertical antes de horizontal": vindo na vertical, os
+# sucessores naturais são seguir em frente e virar para os dois lados; vindo
+# na horizontal só se segue em frente, a não ser que uma virada vertical seja
+# forçada (a célula diagonal de trás está bloqueada). Direções seguem os bits
+# de Maze.nbr_mask: 0 = N, 1 = S, 2 = O, 3 = L.
+# ----------------------------------------------------------------------
+_N, _S, _O, _L = 0, 1, 2, 3
+
+def _jps_offsets(W: int):
+    return (-W, W, -1, 1)
+
+def _jump_h(mask, c: int, k: int, off: int, goal: int):
+    # anda na horizontal a partir de c; retorna o ponto de salto e as células varridas
+    bit = 1 << k
+    steps = 0
+    while mask[c] & bit:
+        n = c + off
+        steps += 1
+        if n == goal:
+            return n, steps
+        mn, mc = mask[n], mask[c]
+        if (mn & 1 and not mc & 1) or (mn & 2 and not mc & 2):
+            return n, steps
+        c = n
+    return -1, steps
+
+def _jump_v(mask, c: int, k: int, off: int, goal: int):
+    bit = 1 << k
+    steps = 0
+    while mask[c] & bit:
+        n = c + off
+        steps += 1
+        if n == goal:
+            return n, steps
+        for kh, offh in ((_O, -1), (_L, 1)):
+            hit, scanned = _jump_h(mask, n, kh, offh, goal)
+            steps += scanned
+            if hit != -1:
+                return n, steps
+        c = n
+    return -1, steps
+
+class JumpTable:
+    """
+    Tabela JPS+ de um labirinto: para cada célula e direção, o próximo ponto
+    de salto independente do objetivo (-1 se o corredor termina numa parede),
+    além de rótulos dos trechos livres horizontais/verticais usados para
+    detectar, em O(1), quando o objetivo está no caminho do salto.
+    """
 
-            if q not in g_score or tentative_g < g_score[q]:
-                child = Node(q, parent=current, action=a, g=tentative_g)
+    def __init__(self, maze):
+        H, W = maze.H, maze.W
+        free = np.frombuffer(maze.cells, dtype=np.uint8).reshape(H, W).astype(bool)
+        ids = np.arange(H * W, dtype=np.int64).reshape(H, W)
+        up = np.zeros_like(free)
+        up[1:, :] = free[:-1, :]
+        down = np.zeros_like(free)
+        down[:-1, :] = free[1:, :]
+        cols = np.broadcast_to(np.arange(W), (H, W))
+        rows = np.broadcast_to(np.arange(H)[:, None], (H, W))
+
+        # viradas forçadas ao chegar em n andando para L (vindo de n-1) ou para O
+        forced_l = np.zeros_like(free)
+        forced_l[:, 1:] = free[:, 1:] & free[:, :-1] & (
+            (up[:, 1:] & ~up[:, :-1]) | (down[:, 1:] & ~down[:, :-1]))
+        forced_o = np.zeros_like(free)
+        forced_o[:, :-1] = free[:, :-1] & free[:, 1:] & (
+            (up[:, :-1] & ~up[:, 1:]) | (down[:, :-1] & ~down[:, 1:]))
+
+        jump_l = self._next_event(~free | forced_l, free, ids, cols, W, forward=True, axis=1)
+        jump_o = self._next_event(~free | forced_o, free, ids, cols, W, forward=False, axis=1)
+        turns = (jump_l != -1) | (jump_o != -1)
+        jump_s = self._next_event(~free | turns, free, ids, rows, H, forward=True, axis=0)
+        jump_n = self._next_event(~free | turns, free, ids, rows, H, forward=False, axis=0)
+
+        def as_array(a):
+            out = array('i')
+            out.frombytes(a.astype(np.int32).tobytes())
+            return out
+
+        self.jumps = tuple(as_array(j) for j in (jump_n, jump_s, jump_o, jump_l))
+        starts_h = free.copy()
+        starts_h[:, 1:] &= ~free[:, :-1]
+        starts_v = free.copy()
+        starts_v[1:, :] &= ~free[:-1, :]
+        # rótulo 0 = parede, para que nunca coincida com o de uma célula livre
+        self.hrun = as_array(np.cumsum(starts_h.ravel()) * free.ravel())
+        self.vrun = as_array(np.cumsum(starts_v.T.ravel()).reshape(W, H).T * free)
+        self.W = W
+
+    @staticmethod
+    def _next_event(event, free, ids, idx, size, forward: bool, axis: int):
+        # primeira célula estritamente depois de cada uma (no sentido do
+        # salto) em que há evento; vira ponto de salto se estiver livre
+        if forward:
+            pos = np.where(event, idx, size)
+            nearest = np.flip(np.minimum.accumulate(np.flip(pos, axis), axis), axis)
+            nxt = np.full_like(nearest, size)
+            if axis == 1:
+                nxt[:, :-1] = nearest[:, 1:]
+            else:
+                nxt[:-1, :] = nearest[1:, :]
+            valid = nxt < size
+        else:
+            pos = np.where(event, idx, -1)
+            nearest = np.maximum.accumulate(pos, axis)
+            nxt = np.full_like(nearest, -1)
+            if axis == 1:
+                nxt[:, 1:] = nearest[:, :-1]
+            else:
+                nxt[1:, :] = nearest[:-1, :]
+            valid = nxt >= 0
+        safe = np.where(valid, nxt, 0)
+        if axis == 1:
+            target = np.take_along_axis(ids, safe, 1)
+        else:
+            target = np.take_along_axis(ids, safe, 0)
+        hit = valid & free.ravel()[target]
+        return np.where(hit, target, -1)
+
+    def jump(self, c: int, k: int, goal: int) -> int:
+        t = self.jumps[k][c]
+        W = self.W
+        if k >= _O:
+            # objetivo no mesmo trecho horizontal, no sentido do salto
+            if goal // W == c // W and self.hrun[goal] == self.hrun[c]:
+                if (goal - c) * (1 if k == _L else -1) > 0:
+                    if t == -1 or abs(goal - c) < abs(t - c):
+                        return goal
+            return t
+        # salto vertical: para na linha do objetivo se dali ele é visível
+        gr, r = goal // W, c // W
+        if (gr - r) * (1 if k == _S else -1) > 0:
+            x = gr * W + c % W
+            if self.vrun[x] == self.vrun[c] and self.hrun[x] == self.hrun[goal]:
+                if t == -1 or abs(x - c) < abs(t - c):
+                    return x
+        return t
+
+def jump_table(maze) -> JumpTable:
+    """Tabela JPS+ do labirinto, montada uma vez e guardada em maze.derived."""
+    table = maze.derived.get('jump_table')
+    if table is None:
+        table = maze.derived['jump_table'] = JumpTable(maze)
+    return table
+
+def jps_search(maze, heuristic: Callable[[Pos, Pos], float], use_table: bool = False) -> SearchResult:
+    """
+    A* sobre pontos de salto (JPS, 4-conexo). Com use_table=True os saltos
+    são consultados na tabela JPS+ pré-computada em vez de varrer o grid.
+    Devolve o caminho completo célula a célula, como a_star_search.
+    """
+    start_time = time.perf_counter()
+    metrics = _common_metrics_init()
+
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    W, mask = maze.W, maze.nbr_mask
+    offsets = _jps_offsets(W)
+    table = jump_table(maze) if use_table else None
+    parent, status = _kernel_arrays(maze)
+    g_score = array('d', [0.0]) * maze.N
+    arrived = bytearray(maze.N)  # direção de chegada (4 = origem)
+    arrived[s] = 4
+    heappush, heappop = heapq.heappush, heapq.heappop
+    goal_pos = maze.goal
+
+    open_heap = [(heuristic(maze.start, goal_pos), 0, s)]
+    status[s] = FRONTIER
+    counter = 0
+    generated = expanded = n_closed = scanned = 0
+    max_frontier, max_explored = 1, 0
+
+    while open_heap:
+        _, _, u = heappop(open_heap)
+        if status[u] == CLOSED:
+            continue
+
+        expanded += 1
+        if u == goal:
+            break
+        status[u] = CLOSED
+        n_closed += 1
+
+        k_in = arrived[u]
+        if k_in == 4:
+            dirs = (_N, _S, _O, _L)
+        elif k_in <= _S:
+            dirs = (k_in, _O, _L)
+        else:
+            prev = u - offsets[k_in]
+            dirs = [k_in]
+            if mask[u] & 1 and not mask[prev] & 1:
+                dirs.append(_N)
+            if mask[u] & 2 and not mask[prev] & 2:
+                dirs.append(_S)
+
+        for k in dirs:
+            off = offsets[k]
+            if table is not None:
+                q = table.jump(u, k, goal)
+            elif k >= _O:
+                q, n = _jump_h(mask, u, k, off, goal)
+                scanned += n
+            else:
+                q, n = _jump_v(mask, u, k, off, goal)
+                scanned += n
+            if q == -1:
+                continue
+            generated += 1
+            if status[q] == CLOSED:
+                continue
+            tentative_g = g_score[u] + (q - u) // off
+            if status[q] == UNSEEN or tentative_g < g_score[q]:
+                status[q] = FRONTIER
                 g_score[q] = tentative_g
+                parent[q] = u
+                arrived[q] = k
                 counter += 1
-                f = tentative_g + heuristic(q, maze.goal)
-                _push_heap(open_heap, f, counter, child)
-                metrics['max_frontier_size'] = max(metrics['max_frontier_size'], len(open_heap))
+                heappush(open_heap, (tentative_g + heuristic(divmod(q, W), goal_pos), counter, q))
+                if len(open_heap) > max_frontier:
+                    max_frontier = len(open_heap)
+
+        if n_closed > max_explored:
+            max_explored = n_closed
+
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored,
+                   cells_scanned=scanned)
+    elapsed = time.perf_counter() - start_time
+    if status[goal] != FRONTIER:
+        return SearchResult(False, [], float('inf'), elapsed, metrics)
+
+    # preenche os trechos retos entre pontos de salto consecutivos
+    jumps = []
+    cell = goal
+    while cell != -1:
+        jumps.append(cell)
+        cell = parent[cell]
+    jumps.reverse()
+    path = [maze.start]
+    for a, b in zip(jumps, jumps[1:]):
+        step = offsets[arrived[b]]
+        for cell in range(a + step, b + step, step):
+            path.append(divmod(cell, W))
+    return SearchResult(True, path, g_score[goal], elapsed, metrics)
+
+# ----------------------------------------------------------------------
+# Custos de terreno: entrar na célula q custa maze.costs[q] (inteiro >= 1,
+# ou 1 em todas se o labirinto não tiver custos). Custo uniforme quando
+# heuristic=None, A* caso contrário.
+# ----------------------------------------------------------------------
+def _cell_costs(maze):
+    return maze.costs if maze.costs is not None else bytes([1]) * maze.N
+
+def uniform_cost_search(maze, heuristic: Optional[Callable[[Pos, Pos], float]] = None) -> SearchResult:
+    """Dijkstra / A* com heap binário (heapq) sobre os custos de terreno."""
+    start_time = time.perf_counter()
+    metrics = _common_metrics_init()
+
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    parent, status = _kernel_arrays(maze)
+    g_score = array('q', [0]) * maze.N
+    costs = _cell_costs(maze)
+    moves, mask, W, goal_pos = maze.moves, maze.nbr_mask, maze.W, maze.goal
+    heappush, heappop = heapq.heappush, heapq.heappop
+
+    open_heap = [(heuristic(maze.start, goal_pos) if heuristic else 0, 0, s)]
+    status[s] = FRONTIER
+    counter = 0
+    generated = expanded = n_closed = 0
+    max_frontier, max_explored = 1, 0
+
+    while open_heap:
+        _, _, u = heappop(open_heap)
+        if status[u] == CLOSED:
+            continue
+
+        expanded += 1
+        if u == goal:
+            metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                           max_frontier_size=max_frontier, max_explored_size=max_explored)
+            elapsed = time.perf_counter() - start_time
+            return SearchResult(True, _kernel_path(maze, parent, u), float(g_score[u]), elapsed, metrics)
+
+        status[u] = CLOSED
+        n_closed += 1
+        g_u = g_score[u]
+
+        for d in moves[mask[u]]:
+            q = u + d
+            generated += 1
+            st = status[q]
+            if st == CLOSED:
+                continue
+            tentative_g = g_u + costs[q]
+            if st == UNSEEN or tentative_g < g_score[q]:
+                status[q] = FRONTIER
+                g_score[q] = tentative_g
+                parent[q] = u
+                counter += 1
+                f = tentative_g + heuristic(divmod(q, W), goal_pos) if heuristic else tentative_g
+                heappush(open_heap, (f, counter, q))
+                if len(open_heap) > max_frontier:
+                    max_frontier = len(open_heap)
+
+        if n_closed > max_explored:
+            max_explored = n_closed
+
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored)
+    elapsed = time.perf_counter() - start_time
+    return SearchResult(False, [], float('inf'), elapsed, metrics)
+
+def dial_search(maze, heuristic: Optional[Callable[[Pos, Pos], float]] = None) -> SearchResult:
+    """
+    Mesma busca de uniform_cost_search, com fila de baldes (Dial) no lugar do
+    heap: as prioridades f são inteiras e, com custos até C e heurística
+    consistente, todo f empilhado fica entre o f atual e f + 2C. Basta então
+    um anel de 2C + 1 baldes, e empilhar/desempilhar custa O(1).
+    A heurística é arredondada para baixo, o que a mantém admissível e
+    consistente com custos inteiros.
+    """
+    start_time = time.perf_counter()
+    metrics = _common_metrics_init()
+
+    s, goal = maze.start_id, maze.goal_id
+    if s == goal:
+        return SearchResult(True, [maze.start], 0.0, 0.0, metrics)
+    if _known_unreachable(maze, s, goal):
+        return _unreachable(metrics, start_time)
+
+    parent, status = _kernel_arrays(maze)
+    g_score = array('q', [0]) * maze.N
+    costs = _cell_costs(maze)
+    moves, mask, W, goal_pos = maze.moves, maze.nbr_mask, maze.W, maze.goal
+    C = maze.max_cost
+    width = 2 * C + 1 if heuristic else C + 1
+    buckets = [[] for _ in range(width)]
+
+    f_cur = int(heuristic(maze.start, goal_pos)) if heuristic else 0
+    buckets[f_cur % width].append(s)
+    status[s] = FRONTIER
+    size = 1
+    generated = expanded = n_closed = 0
+    max_frontier, max_explored = 1, 0
+
+    while size:
+        bucket = buckets[f_cur % width]
+        while not bucket:
+            f_cur += 1
+            bucket = buckets[f_cur % width]
+        u = bucket.pop()
+        size -= 1
+        if status[u] == CLOSED:
+            continue
+
+        expanded += 1
+        if u == goal:
+            metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                           max_frontier_size=max_frontier, max_explored_size=max_explored)
+            elapsed = time.perf_counter() - start_time
+            return SearchResult(True, _kernel_path(maze, parent, u), float(g_score[u]), elapsed, metrics)
+
+        status[u] = CLOSED
+        n_closed += 1
+        g_u = g_score[u]
+
+        for d in moves[mask[u]]:
+            q = u + d
+            generated += 1
+            st = status[q]
+            if st == CLOSED:
+                continue
+            tentative_g = g_u + costs[q]
+            if st == UNSEEN or tentative_g < g_score[q]:
+                status[q] = FRONTIER
+                g_score[q] = tentative_g
+                parent[q] = u
+                f = tentative_g + int(heuristic(divmod(q, W), goal_pos)) if heuristic else tentative_g
+                if not f_cur <= f < f_cur + width:
+                    raise ValueError("Heurística inconsistente: f fora da janela de baldes")
+                buckets[f % width].append(q)
+                size += 1
+                if size > max_frontier:
+                    max_frontier = size
 
-        metrics['max_explored_size'] = max(metrics['max_explored_size'], len(closed))
+        if n_closed > max_explored:
+            max_explored = n_closed
 
+    metrics.update(nodes_generated=generated, nodes_expanded=expanded,
+                   max_frontier_size=max_frontier, max_explored_size=max_explored)
     elapsed = time.perf_counter() - start_time
     return SearchResult(False, [], float('inf'), elapsed, metrics)